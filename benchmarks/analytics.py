@@ -0,0 +1,144 @@
+# benchmarks/analytics.py
+"""The columnar analytics snapshot against the equivalent SQL.
+
+For each ledger size it times loading the snapshot, an incremental
+refresh after a handful of inserts, and each report query three ways:
+a GROUP BY (or sort) in SQLite, the snapshot with NumPy and the snapshot
+in pure Python (the NumPy column is skipped when it isn't installed).
+
+    python benchmarks/analytics.py --sizes 100000,1000000
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from udhar import analytics
+from udhar.analytics import ExpenseColumns
+from udhar.database import Database
+from benchmarks.data_layer import git_commit
+from benchmarks.synthetic import generate_expenses
+
+START, END = '2024-01-01', '2024-12-31'
+
+
+def sql_percentiles(db):
+    with db.session() as conn:
+        amounts = [row[0] for row in conn.execute(
+            "SELECT amount FROM expenses WHERE transaction_type = 'expense' "
+            "AND date BETWEEN ? AND ? ORDER BY amount", (START, END))]
+    return {q: analytics._percentile(amounts, q) / 100 for q in (50, 90, 99)}
+
+
+def sql_query(query):
+    def run(db):
+        with db.session() as conn:
+            return conn.execute(query, (START, END)).fetchall()
+    return run
+
+
+# name -> (SQL equivalent, snapshot call)
+QUERIES = {
+    'pivot': (
+        sql_query("SELECT category, substr(date, 1, 7), SUM(amount) FROM expenses "
+                  "WHERE transaction_type = 'expense' AND date BETWEEN ? AND ? "
+                  "GROUP BY 1, 2"),
+        lambda columns: columns.pivot(START, END)),
+    'weekday_totals': (
+        sql_query("SELECT strftime('%w', date), SUM(amount) FROM expenses "
+                  "WHERE transaction_type = 'expense' AND date BETWEEN ? AND ? "
+                  "GROUP BY 1"),
+        lambda columns: columns.weekday_totals(START, END)),
+    'top_categories': (
+        sql_query("SELECT category, SUM(amount) FROM expenses "
+                  "WHERE transaction_type = 'expense' AND date BETWEEN ? AND ? "
+                  "GROUP BY 1 ORDER BY 2 DESC LIMIT 5"),
+        lambda columns: columns.top_categories(5, START, END)),
+    'percentiles': (
+        sql_percentiles,
+        lambda columns: columns.percentiles((50, 90, 99), START, END)),
+    'largest': (
+        sql_query("SELECT id, amount FROM expenses "
+                  "WHERE transaction_type = 'expense' AND date BETWEEN ? AND ? "
+                  "ORDER BY amount DESC, id LIMIT 10"),
+        lambda columns: columns.largest(10, START, END)),
+}
+
+
+def median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def run_size(size, args):
+    results = []
+    modes = [False] + ([True] if analytics.np is not None else [])
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database(os.path.join(directory, 'bench.db'), cache_size=0)
+        db.add_expenses_bulk(generate_expenses(size, args.seed))
+        snapshots = {}
+        for use_numpy in modes:
+            columns = ExpenseColumns(db, use_numpy=use_numpy)
+            start = time.perf_counter()
+            columns.refresh()
+            load_ms = round((time.perf_counter() - start) * 1000, 1)
+            snapshots['numpy' if use_numpy else 'python'] = columns
+        results.append({'size': size, 'benchmark': 'load', 'ms': load_ms,
+                        'snapshot_mb': round(columns.nbytes() / 2**20, 1)})
+
+        db.add_expenses_bulk(generate_expenses(args.inserts, args.seed + 1))
+        start = time.perf_counter()
+        columns.refresh()
+        results.append({'size': size, 'benchmark': f'refresh[+{args.inserts}]',
+                        'ms': round((time.perf_counter() - start) * 1000, 3)})
+        for other in snapshots.values():
+            other.refresh()
+
+        for name, (sql, snapshot_query) in QUERIES.items():
+            result = {'size': size, 'benchmark': name,
+                      'sql_ms': median_ms(lambda: sql(db), args.repeat)}
+            for mode, columns in snapshots.items():
+                result[f'{mode}_ms'] = median_ms(lambda: snapshot_query(columns), args.repeat)
+            results.append(result)
+        db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the columnar analytics snapshot")
+    parser.add_argument('--sizes', default='100000')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--inserts', type=int, default=100,
+                        help="Rows added before timing the incremental refresh")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(',')):
+        results.extend(run_size(size, args))
+
+    output = json.dumps({
+        'meta': {'commit': git_commit(), 'numpy': analytics.np is not None,
+                 'args': vars(args)},
+        'results': results,
+    }, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
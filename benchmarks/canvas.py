@@ -0,0 +1,117 @@
+# benchmarks/canvas.py
+"""Graphics-instruction allocations and time for Card layout passes.
+
+Mounts a column of cards offscreen and forces layout passes by resizing
+it, the same pos/size churn a scrolling list or rotation causes. It
+compares the persistent-instruction Card against the previous
+clear-and-recreate canvas, which is reproduced here as LegacyCard.
+Instruction allocations are counted by swapping counting subclasses into
+widgets.custom_widgets for the duration of each run.
+
+    python benchmarks/canvas.py --cards 500 --passes 50
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+
+from kivy.config import Config
+Config.set('graphics', 'maxfps', '0')
+
+from kivy.base import EventLoop
+from kivy.core.window import Window
+from kivy.graphics import Color, Rectangle, RoundedRectangle
+from kivy.metrics import dp
+from kivy.uix.boxlayout import BoxLayout
+
+from widgets import custom_widgets
+from widgets.custom_widgets import Bar, Card
+
+allocations = {'count': 0}
+
+
+class CountingColor(Color):
+    def __init__(self, *args, **kwargs):
+        allocations['count'] += 1
+        super().__init__(*args, **kwargs)
+
+
+class CountingRectangle(Rectangle):
+    def __init__(self, *args, **kwargs):
+        allocations['count'] += 1
+        super().__init__(*args, **kwargs)
+
+
+class CountingRoundedRectangle(RoundedRectangle):
+    def __init__(self, *args, **kwargs):
+        allocations['count'] += 1
+        super().__init__(*args, **kwargs)
+
+
+class LegacyCard(Card):
+    """Card as it was: the canvas is cleared and rebuilt on every pos/size"""
+    def update_canvas(self, *args):
+        self.canvas.before.clear()
+        with self.canvas.before:
+            custom_widgets.Color(*self.bg_color)
+            custom_widgets.RoundedRectangle(pos=self.pos, size=self.size, radius=self.radius)
+
+
+def run(card_class, cards, passes, with_bars):
+    column = BoxLayout(orientation='vertical', size_hint=(None, None),
+                       size=(dp(360), cards * dp(70)))
+    for index in range(cards):
+        card = card_class(bg_color=(0.98, 0.98, 0.98, 1), radius=[dp(5)])
+        card.height = dp(60)
+        if with_bars:
+            card.add_widget(Bar(fraction=index / cards))
+        column.add_widget(card)
+    Window.add_widget(column)
+    EventLoop.idle()
+
+    allocations['count'] = 0
+    start = time.perf_counter()
+    for step in range(passes):
+        # Alternate widths so every card moves and resizes each pass
+        column.width = dp(360) + (step % 2) * dp(40)
+        EventLoop.idle()
+    elapsed = time.perf_counter() - start
+
+    Window.remove_widget(column)
+    EventLoop.idle()
+    return {
+        'card': card_class.__name__,
+        'bars': with_bars,
+        'instruction_allocations': allocations['count'],
+        'allocations_per_pass': round(allocations['count'] / passes, 1),
+        'ms_per_pass': round(elapsed * 1000 / passes, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Card canvas updates")
+    parser.add_argument('--cards', type=int, default=500)
+    parser.add_argument('--passes', type=int, default=50)
+    args = parser.parse_args()
+
+    EventLoop.ensure_window()
+    custom_widgets.Color = CountingColor
+    custom_widgets.Rectangle = CountingRectangle
+    custom_widgets.RoundedRectangle = CountingRoundedRectangle
+    results = [
+        run(card_class, args.cards, args.passes, with_bars)
+        for card_class in (LegacyCard, Card)
+        for with_bars in (False, True)
+    ]
+    print(json.dumps({'args': vars(args), 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+# benchmarks/data_layer.py
+"""Timings for the Database API over synthetic ledgers, as JSON.
+
+Each ledger size gets a fresh database seeded from benchmarks/synthetic.py,
+then every benchmark is repeated and reported as min/median milliseconds
+per call:
+
+    python benchmarks/data_layer.py --sizes 10000,100000 --out before.json
+    python benchmarks/data_layer.py --sizes 10000,100000 --out after.json
+    python benchmarks/data_layer.py --compare before.json after.json
+
+--profile legacy runs against SQLite's default journal and sync settings
+instead of the app's StorageProfile. The query cache is off unless --cache
+gives it a size, so repeated calls measure the queries themselves.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from udhar.database import PROFILES, Database
+from benchmarks.synthetic import generate_expenses, generate_payments, generate_udhar
+
+
+def timed(fn, repeat: int) -> dict:
+    """Call fn() repeat times; per-call milliseconds plus its last result size"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        result = result[0]  # (rows, cursor) from the paginated APIs
+    return {
+        'calls': repeat,
+        'min_ms': round(min(samples), 4),
+        'median_ms': round(statistics.median(samples), 4),
+        'rows': len(result) if isinstance(result, list) else None,
+    }
+
+
+def seed_ledger(db: Database, expenses: int, persons: int, loans: int,
+                payments: int, seed: int) -> float:
+    """Bulk-load the synthetic ledger; returns how long it took in ms"""
+    start = time.perf_counter()
+    db.add_expenses_bulk(generate_expenses(expenses, seed))
+    db.add_udhar_bulk(generate_udhar(persons, loans, seed))
+    db.record_payments(generate_payments(db.get_udhar_list(), payments, seed))
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def run_size(size: int, args) -> list:
+    results = []
+
+    def record(name, fn, repeat=args.repeat):
+        results.append(dict(size=size, benchmark=name, **timed(fn, repeat)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database(os.path.join(directory, 'bench.db'), profile=PROFILES[args.profile],
+                      cache_size=args.cache)
+        seed_ms = seed_ledger(db, size, args.persons, args.loans, args.payments, args.seed)
+        results.append(dict(size=size, benchmark='seed', calls=1,
+                            min_ms=seed_ms, median_ms=seed_ms, rows=None))
+
+        # Writes first use fresh rows so the reads below see a stable ledger
+        new_rows = iter(list(generate_expenses(args.writes, args.seed + 1)))
+        record('add_expense', lambda: db.add_expense(next(new_rows)), args.writes)
+
+        record('get_expenses', db.get_expenses)
+        record('get_expenses[projected]',
+               lambda: db.get_expenses(columns=('id', 'amount', 'category', 'date')))
+        record('get_expenses[month]',
+               lambda: db.get_expenses('2025-06-01', '2025-06-30'))
+        record('get_expenses[category]',
+               lambda: db.get_expenses(category='Food'))
+        record('get_expenses_page', lambda: db.get_expenses_page(limit=50))
+        record('get_categories', db.get_categories)
+        record('get_udhar_list', db.get_udhar_list)
+        record('get_udhar_list[pending]', lambda: db.get_udhar_list('pending'))
+
+        loans = [row.id for row in db.get_udhar_list('pending', columns=('id',))[:args.writes]]
+        payments = iter(loans)
+        record('update_udhar_payment',
+               lambda: db.update_udhar_payment(next(payments), 1.0), len(loans))
+
+        months = iter([(2024 + m // 12, m % 12 + 1) for m in range(24)] * args.repeat)
+        record('get_monthly_summary', lambda: db.get_monthly_summary(*next(months)))
+        db.close()
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(before_path: str, after_path: str):
+    """Print median ratios (after / before) for benchmarks present in both"""
+    with open(before_path) as f:
+        before = {(r['size'], r['benchmark']): r for r in json.load(f)['results']}
+    with open(after_path) as f:
+        after = json.load(f)['results']
+    for result in after:
+        old = before.get((result['size'], result['benchmark']))
+        if old is None or not old['median_ms']:
+            continue
+        ratio = result['median_ms'] / old['median_ms']
+        print(f"{result['size']:>9} {result['benchmark']:<26} "
+              f"{old['median_ms']:>10.3f} -> {result['median_ms']:>10.3f} ms  x{ratio:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Database API")
+    parser.add_argument('--sizes', default='10000,100000',
+                        help="Comma-separated expense counts, e.g. 10000,100000,1000000")
+    parser.add_argument('--persons', type=int, default=2000)
+    parser.add_argument('--loans', type=int, default=5, help="Udhar records per person")
+    parser.add_argument('--payments', type=int, default=3, help="Max payments per loan")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--writes', type=int, default=200,
+                        help="Calls for the single-row write benchmarks")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='default',
+                        help="Storage profile (connection PRAGMAs)")
+    parser.add_argument('--cache', type=int, default=0,
+                        help="Query cache entries (0: uncached)")
+    parser.add_argument('--out', help="Write JSON here instead of stdout")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'),
+                        help="Compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(',')):
+        results.extend(run_size(size, args))
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'args': vars(args),
+        },
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
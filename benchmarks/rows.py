@@ -0,0 +1,121 @@
+# benchmarks/rows.py
+"""Memory and time to materialise large expense result sets.
+
+Compares the shapes a get_expenses() result can take:
+
+    tuples              plain sqlite3 tuples (what queries returned before)
+    tuples+dataclass    those tuples plus an Expense dataclass per row, the
+                        usual way to get named fields out of them
+    records             ExpenseRecord rows built by the row_factory
+    projected           get_expenses(columns=...) with only the fields a
+                        list row shows
+
+Memory is measured with tracemalloc: `retained` is what the result holds
+once returned, `peak` the high-water mark while building it. Timings come
+from separate runs without tracemalloc.
+
+    python benchmarks/rows.py --rows 1000000
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from udhar.database import SELECT_COLUMNS, Database
+from udhar.models import Expense, TransactionType
+from benchmarks.data_layer import git_commit
+from benchmarks.synthetic import generate_expenses
+
+PROJECTION = ('id', 'amount', 'category', 'date')
+
+
+def fetch_tuples(db):
+    with db.session() as conn:
+        return conn.execute(
+            f"SELECT {SELECT_COLUMNS['expenses']} FROM expenses "
+            f"ORDER BY date DESC, id DESC").fetchall()
+
+
+def fetch_dataclasses(db):
+    rows = fetch_tuples(db)
+    return rows, [Expense(row[0], row[1], row[2], row[3], row[4], TransactionType(row[5]))
+                  for row in rows]
+
+
+SHAPES = {
+    'tuples': fetch_tuples,
+    'tuples+dataclass': fetch_dataclasses,
+    'records': lambda db: db.get_expenses(),
+    'projected': lambda db: db.get_expenses(columns=PROJECTION),
+}
+
+
+def measure_memory(db, fetch):
+    gc.collect()
+    tracemalloc.start()
+    result = fetch(db)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained, peak
+
+
+def measure_time(db, fetch, repeat):
+    samples = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = fetch(db)
+        samples.append((time.perf_counter() - start) * 1000)
+        del result
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark result-set memory by row type")
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        # Uncached, so every call really builds its rows
+        db = Database(os.path.join(directory, 'bench.db'), cache_size=0)
+        db.add_expenses_bulk(generate_expenses(args.rows, args.seed))
+        for name, fetch in SHAPES.items():
+            retained, peak = measure_memory(db, fetch)
+            samples = measure_time(db, fetch, args.repeat)
+            results.append({
+                'shape': name,
+                'rows': args.rows,
+                'retained_mb': round(retained / 2**20, 1),
+                'peak_mb': round(peak / 2**20, 1),
+                'bytes_per_row': round(retained / args.rows, 1),
+                'min_ms': round(min(samples), 1),
+                'median_ms': round(statistics.median(samples), 1),
+            })
+        db.close()
+
+    output = json.dumps({
+        'meta': {'commit': git_commit(), 'args': vars(args)},
+        'results': results,
+    }, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/startup.py
+"""Cold-start timing for the app: time to import main (Kivy, window and
+data layer), time until App.on_start, and time to the first drawn frame.
+
+Every run is a fresh interpreter so warm module caches don't flatter the
+numbers. Compare against building every screen up front with --all-screens:
+
+    python benchmarks/startup.py --runs 5
+    python benchmarks/startup.py --runs 5 --all-screens
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Keep Kivy from parsing our arguments or logging to the console
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+METRICS = ('import_s', 'start_s', 'first_frame_s')
+
+
+def measure(db_path, all_screens=False):
+    """Start the app once in this process and return its timings"""
+    start = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    import main
+    from kivy.core.window import Window
+
+    timings = {'import_s': time.perf_counter() - start}
+    app = main.UdharExpenseApp()
+    app.db_path = db_path
+
+    def on_start(*args):
+        if all_screens:
+            for name in main.SCREENS:
+                app.sm.get_screen(name)
+        timings['start_s'] = time.perf_counter() - start
+
+    def on_flip(*args):
+        Window.unbind(on_flip=on_flip)
+        timings['first_frame_s'] = time.perf_counter() - start
+        timings['screens_built'] = len(app.sm.screens)
+        app.stop()
+
+    app.bind(on_start=on_start)
+    Window.bind(on_flip=on_flip)
+    app.run()
+    return timings
+
+
+def seed(db_path, rows):
+    sys.path.insert(0, ROOT)
+    from udhar.database import Database
+    from udhar.models import Expense, TransactionType
+
+    db = Database(db_path)
+    db.add_expenses_bulk(
+        Expense(None, 100 + i % 900, ('Food', 'Bills', 'Rent')[i % 3], f'seed {i}',
+                f'2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}', TransactionType.EXPENSE)
+        for i in range(rows))
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app cold-start time")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--rows', type=int, default=10000,
+                        help="Expenses seeded into the benchmark database")
+    parser.add_argument('--all-screens', action='store_true',
+                        help="Build every screen before the first frame")
+    parser.add_argument('--child', metavar='DB', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.all_screens)))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'startup.db')
+        seed(db_path, args.rows)
+
+        command = [sys.executable, os.path.abspath(__file__), '--child', db_path]
+        if args.all_screens:
+            command.append('--all-screens')
+        runs = []
+        for _ in range(args.runs):
+            output = subprocess.run(command, check=True, capture_output=True,
+                                    text=True).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(json.dumps({
+        'runs': args.runs,
+        'rows': args.rows,
+        'screens_built': runs[-1]['screens_built'],
+        'median': {key: round(statistics.median(run[key] for run in runs), 4)
+                   for key in METRICS},
+        'min': {key: round(min(run[key] for run in runs), 4) for key in METRICS},
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/synthetic.py
+"""Reproducible synthetic ledgers for the benchmarks.
+
+Everything is drawn from a seeded random.Random, so the same arguments
+always produce the same rows and results stay comparable between commits.
+"""
+import random
+from datetime import date, timedelta
+from typing import Iterator, List, Tuple
+
+from udhar.models import Expense, Udhar, TransactionType, UdharStatus, UdharRecord
+
+START_DATE = date(2024, 1, 1)
+DAYS = 730
+EXPENSE_CATEGORIES = [
+    "Food", "Transport", "Shopping", "Entertainment", "Bills", "Health",
+    "Education", "Rent", "Groceries", "Personal", "Gifts", "Other",
+]
+INCOME_CATEGORIES = ["Salary", "Freelance", "Investment"]
+WORDS = ["tea", "lunch", "cab", "metro", "rent", "milk", "vegetables",
+         "movie", "recharge", "electricity", "medicine", "books", "gift"]
+
+
+def _day(rng: random.Random) -> str:
+    return (START_DATE + timedelta(days=rng.randrange(DAYS))).isoformat()
+
+
+def generate_expenses(count: int, seed: int = 0) -> Iterator[Expense]:
+    """count expenses over two years, roughly one in ten of them income"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        if rng.random() < 0.1:
+            yield Expense(None, rng.randrange(5000, 100000), rng.choice(INCOME_CATEGORIES),
+                          "", _day(rng), TransactionType.INCOME)
+        else:
+            yield Expense(None, round(rng.uniform(10, 3000), 2), rng.choice(EXPENSE_CATEGORIES),
+                          " ".join(rng.sample(WORDS, 2)), _day(rng), TransactionType.EXPENSE)
+
+
+def generate_udhar(persons: int, loans_per_person: int, seed: int = 0) -> Iterator[Udhar]:
+    """loans_per_person loans for each of `persons` people"""
+    rng = random.Random(seed)
+    for person in range(persons):
+        name = f"Person {person:05d}"
+        for _ in range(loans_per_person):
+            due = rng.choice([None, _day(rng)])
+            yield Udhar(None, name, round(rng.uniform(100, 20000), 2),
+                        rng.choice(WORDS), _day(rng), due, UdharStatus.PENDING)
+
+
+def generate_payments(loans: List[UdharRecord], payments_per_loan: int,
+                      seed: int = 0) -> List[Tuple[int, float]]:
+    """(udhar_id, amount) partial payments for get_udhar_list rows, each
+    small enough that a loan is never overpaid"""
+    rng = random.Random(seed)
+    payments = []
+    for loan in loans:
+        for _ in range(rng.randrange(payments_per_loan + 1)):
+            payments.append((loan.id, round(loan.amount / (payments_per_loan * 2), 2)))
+    return payments
@@ -0,0 +1,165 @@
+# benchmarks/ui.py
+"""Offscreen rendering benchmark for the screens.
+
+Mounts ExpenseScreen, UdharScreen and ReportScreen in an offscreen SDL
+window against seeded databases and measures, per screen:
+
+    build_ms        constructing the screen
+    first_render_ms construction until its data is shown and drawn
+    refresh         load_data/generate_report split into DB and widget time
+                    (the same numbers as the in-app debug overlay)
+    widgets         widget count once loaded
+    frames          frame times while scrolling its list
+
+    python benchmarks/ui.py --sizes 1000,10000,100000 --out ui.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+# Render without a display
+os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+
+from kivy.config import Config
+# Don't let the frame-rate cap pad the frame times
+Config.set('graphics', 'maxfps', '0')
+Config.set('graphics', 'width', '360')
+Config.set('graphics', 'height', '640')
+
+from kivy.base import EventLoop
+from kivy.core.window import Window
+
+from benchmarks.data_layer import seed_ledger, git_commit
+from db_worker import DatabaseWorker
+from udhar.database import Database
+from screens.expense_screen import ExpenseScreen
+from screens.udhar_screen import UdharScreen
+from screens.report_screen import ReportScreen
+
+SCREENS = [
+    ('expenses', ExpenseScreen, 'transactions_list', 'load_data'),
+    ('udhar', UdharScreen, 'udhar_list', 'load_data'),
+    ('reports', ReportScreen, None, 'generate_report'),
+]
+
+
+def frame():
+    """Run one main-loop iteration (clock, layout, draw); returns its ms"""
+    start = time.perf_counter()
+    EventLoop.idle()
+    return (time.perf_counter() - start) * 1000
+
+
+def settle(screen, timeout=60):
+    """Pump frames until the screen's refresh has finished and been drawn"""
+    deadline = time.perf_counter() + timeout
+    frame()
+    while screen.pending_requests or screen.refresh_timing is not None:
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"{screen.name} did not finish loading")
+        frame()
+        time.sleep(0.001)
+    frame()
+
+
+def widget_count(widget):
+    return sum(1 for _ in widget.walk())
+
+
+def frame_summary(samples):
+    ordered = sorted(samples)
+    return {
+        'count': len(samples),
+        'median_ms': round(statistics.median(ordered), 3),
+        'p95_ms': round(ordered[int(len(ordered) * 0.95) - 1], 3),
+        'max_ms': round(ordered[-1], 3),
+    }
+
+
+def bench_screen(db, worker, name, screen_class, list_attr, refresh, args):
+    start = time.perf_counter()
+    screen = screen_class(db=db, worker=worker, name=name)
+    built = time.perf_counter()
+    Window.add_widget(screen)
+    settle(screen)
+    result = {
+        'screen': name,
+        'build_ms': round((built - start) * 1000, 3),
+        'first_render_ms': round((time.perf_counter() - start) * 1000, 3),
+        'widgets': widget_count(screen),
+    }
+
+    refreshes = []
+    for _ in range(args.repeat):
+        getattr(screen, refresh)()
+        settle(screen)
+        refreshes.append(screen.last_refresh)
+    result['refresh'] = {
+        key: round(statistics.median(r[key] for r in refreshes), 3)
+        for key in ('db_ms', 'ui_ms')
+    }
+
+    if list_attr:
+        # Scroll top to bottom and back, one step per frame
+        view = getattr(screen, list_attr)
+        samples = []
+        for step in range(args.frames):
+            position = step / (args.frames // 2)
+            view.scroll_y = 1 - position if position <= 1 else position - 1
+            samples.append(frame())
+        result['frames'] = frame_summary(samples)
+        result['rows'] = len(view.data)
+
+    Window.remove_widget(screen)
+    frame()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark screen rendering offscreen")
+    parser.add_argument('--sizes', default='1000,10000',
+                        help="Comma-separated expense counts to seed")
+    parser.add_argument('--persons', type=int, default=200)
+    parser.add_argument('--loans', type=int, default=3)
+    parser.add_argument('--payments', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=5, help="Refreshes per screen")
+    parser.add_argument('--frames', type=int, default=120, help="Frames of scrolling")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    EventLoop.ensure_window()
+    results = []
+    for size in (int(s) for s in args.sizes.split(',')):
+        with tempfile.TemporaryDirectory() as directory:
+            db = Database(os.path.join(directory, 'bench.db'))
+            seed_ledger(db, size, args.persons, args.loans, args.payments, args.seed)
+            worker = DatabaseWorker(db)
+            for name, screen_class, list_attr, refresh in SCREENS:
+                result = bench_screen(db, worker, name, screen_class, list_attr, refresh, args)
+                results.append(dict(size=size, **result))
+            worker.shutdown()
+            db.close()
+
+    output = json.dumps({
+        'meta': {'commit': git_commit(), 'window': type(Window).__name__,
+                 'args': vars(args)},
+        'results': results,
+    }, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
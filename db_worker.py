@@ -0,0 +1,121 @@
+# db_worker.py
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from kivy.clock import Clock
+from kivy.logger import Logger
+
+# Writes submitted within this many seconds of the first share a transaction
+COALESCE_WINDOW = 0.005
+
+class DatabaseWorker:
+    """Runs database calls on one dedicated thread so the Kivy main loop
+    never blocks on SQLite. Results are handed back on the main thread."""
+    
+    def __init__(self, db, coalesce_window: float = COALESCE_WINDOW):
+        self.db = db
+        self.coalesce_window = coalesce_window
+        # A single thread keeps requests in submission order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db')
+        # Writes waiting for their batch to close: [(future, fn, args, kwargs)]
+        self._batch = None
+        self._batch_timer = None
+        self._batch_lock = threading.Lock()
+        self._closed = False
+    
+    def submit(self, fn: Callable, *args,
+               on_result: Optional[Callable] = None,
+               on_error: Optional[Callable] = None, **kwargs) -> Future:
+        """Run fn(*args, **kwargs) on the DB thread.
+        
+        on_result(value) or on_error(exception) is then called from the
+        Kivy main loop via Clock.schedule_once.
+        """
+        # Writes already queued run first, so reads see them
+        self._close_batch()
+        future = self._executor.submit(fn, *args, **kwargs)
+        self._on_done(future, on_result, on_error)
+        return future
+    
+    def submit_write(self, fn: Callable, *args,
+                     on_result: Optional[Callable] = None,
+                     on_error: Optional[Callable] = None, **kwargs) -> Future:
+        """Like submit(), for a Database write. Writes arriving within
+        coalesce_window of each other commit in one transaction, each in
+        its own savepoint so a failing one doesn't undo the rest. Results
+        are delivered once the shared transaction has committed."""
+        future = Future()
+        with self._batch_lock:
+            if self._batch is None:
+                self._batch = []
+                self._batch_timer = threading.Timer(self.coalesce_window, self._close_batch)
+                self._batch_timer.daemon = True
+                self._batch_timer.start()
+            self._batch.append((future, fn, args, kwargs))
+        self._on_done(future, on_result, on_error)
+        return future
+    
+    def _close_batch(self):
+        with self._batch_lock:
+            batch, self._batch = self._batch, None
+            if self._batch_timer is not None:
+                self._batch_timer.cancel()
+                self._batch_timer = None
+            if batch:
+                self._executor.submit(self._run_batch, batch)
+    
+    def _run_batch(self, batch):
+        # Runs on the DB thread
+        results = []
+        try:
+            with self.db.session(immediate=True):
+                for future, fn, args, kwargs in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with self.db.session():
+                            results.append((future, fn(*args, **kwargs)))
+                    except Exception as error:
+                        future.set_exception(error)
+        except Exception as error:
+            # The transaction itself failed: none of the batch was written
+            for future, *_ in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for future, result in results:
+            future.set_result(result)
+    
+    def flush(self):
+        """Block until every submitted write has committed, then checkpoint
+        so it is durable on disk (App.on_pause/on_stop). A no-op once
+        shut down."""
+        if self._closed:
+            return
+        self._close_batch()
+        self._executor.submit(self.db.checkpoint).result()
+    
+    def _on_done(self, future, on_result, on_error):
+        def done(finished):
+            Clock.schedule_once(lambda dt: self._deliver(finished, on_result, on_error), 0)
+        
+        future.add_done_callback(done)
+    
+    def _deliver(self, future, on_result, on_error):
+        error = future.exception()
+        if error is None:
+            if on_result:
+                on_result(future.result())
+        elif on_error:
+            on_error(error)
+        else:
+            Logger.error(f"DatabaseWorker: {error!r}")
+    
+    def shutdown(self, wait: bool = True):
+        # Kivy can dispatch on_stop twice on desktop, so this may run again
+        if self._closed:
+            return
+        self._closed = True
+        self._close_batch()
+        self._executor.shutdown(wait=wait)
@@ -1,14 +1,16 @@
 # main.py
+import importlib
+import os
+
 from kivy.app import App
+from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.screenmanager import ScreenManager, SlideTransition
 from kivy.core.window import Window
 from kivy.config import Config
 from kivy.metrics import dp
 
-from database import Database
-from screens.expense_screen import ExpenseScreen
-from screens.udhar_screen import UdharScreen
-from screens.report_screen import ReportScreen
+from udhar.database import Database
+from db_worker import DatabaseWorker
 
 # Mobile-friendly configuration
 Config.set('graphics', 'width', '360')
@@ -17,17 +19,45 @@ Config.set('input', 'mouse', 'mouse,multitouch_on_demand')
 
 Window.clearcolor = (0.95, 0.95, 0.95, 1)
 
+# Screen name -> (module, class). Screens are imported and built the first
+# time they are shown, so a cold start only pays for DEFAULT_SCREEN.
+SCREENS = {
+    'expenses': ('screens.expense_screen', 'ExpenseScreen'),
+    'udhar': ('screens.udhar_screen', 'UdharScreen'),
+    'reports': ('screens.report_screen', 'ReportScreen'),
+    'person': ('screens.person_screen', 'PersonScreen'),
+}
+DEFAULT_SCREEN = 'expenses'
+# Set to show the debug overlay from startup; F12 toggles it either way
+DEBUG_ENV = 'UDHAR_DEBUG'
+F12 = 293
+
+class LazyScreenManager(ScreenManager):
+    """ScreenManager that builds a registered screen on first use, whether
+    by switching `current` to it or by get_screen()"""
+    def __init__(self, factory, **kwargs):
+        self.factory = factory
+        super().__init__(**kwargs)
+    
+    def get_screen(self, name):
+        if name in SCREENS and not self.has_screen(name):
+            self.add_widget(self.factory(name))
+        return super().get_screen(name)
+
 class UdharExpenseApp(App):
+    # None: udhar_expense.db in the app's user data dir
+    db_path = None
+    
     def build(self):
-        self.db = Database()
-        
-        # Create screen manager
-        sm = ScreenManager(transition=SlideTransition())
+        # Mobile storage lives in the app's user data directory
+        self.db = Database(self.db_path, data_dir_resolver=lambda: self.user_data_dir)
+        # Every screen shares one DB thread so requests stay ordered
+        self.worker = DatabaseWorker(self.db)
         
-        # Add screens
-        sm.add_widget(ExpenseScreen(db=self.db, name='expenses'))
-        sm.add_widget(UdharScreen(db=self.db, name='udhar'))
-        sm.add_widget(ReportScreen(db=self.db, name='reports'))
+        # Create screen manager; only the default screen exists up front
+        sm = LazyScreenManager(self.build_screen, transition=SlideTransition())
+        sm.current = DEFAULT_SCREEN
+        self.sm = sm
         
         # Bottom navigation
         root = BoxLayout(orientation='vertical')
@@ -47,8 +77,35 @@ class UdharExpenseApp(App):
         
         root.add_widget(nav)
         
+        self.root_layout = root
+        self.debug_overlay = None
+        if os.environ.get(DEBUG_ENV):
+            self.toggle_debug_overlay()
+        Window.bind(on_key_down=self.on_key_down)
+        
         return root
     
+    def on_key_down(self, window, key, *args):
+        if key == F12:
+            self.toggle_debug_overlay()
+            return True
+    
+    def toggle_debug_overlay(self):
+        if self.debug_overlay:
+            self.debug_overlay.stop()
+            self.root_layout.remove_widget(self.debug_overlay)
+            self.debug_overlay = None
+            return
+        from widgets.debug_overlay import DebugOverlay
+        self.debug_overlay = DebugOverlay(self.sm)
+        # Top of the vertical root, above the screens
+        self.root_layout.add_widget(self.debug_overlay, index=len(self.root_layout.children))
+    
+    def build_screen(self, name):
+        module_name, class_name = SCREENS[name]
+        screen_class = getattr(importlib.import_module(module_name), class_name)
+        return screen_class(db=self.db, worker=self.worker, name=name)
+    
     def create_nav_btn(self, icon, text, sm, screen_name):
         from kivy.uix.button import Button
         btn = Button(
@@ -59,6 +116,18 @@ class UdharExpenseApp(App):
             on_press=lambda x: setattr(sm, 'current', screen_name)
         )
         return btn
+    
+    def on_pause(self):
+        # The OS may kill a paused app without warning: commit queued
+        # writes and checkpoint the WAL so nothing is lost
+        self.worker.flush()
+        return True
+    
+    def on_stop(self):
+        # Let queued DB work finish durably, then release the pooled connections
+        self.worker.flush()
+        self.worker.shutdown()
+        self.db.close()
 
 if __name__ == '__main__':
     UdharExpenseApp().run()
\ No newline at end of file
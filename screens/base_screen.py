@@ -1,14 +1,40 @@
 # screens/base_screen.py
+import time
+
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.scrollview import ScrollView
+from kivy.uix.label import Label
 from kivy.metrics import dp
+from kivy.clock import Clock
+
+from db_worker import DatabaseWorker
 
 class BaseScreen(Screen):
-    def __init__(self, db, **kwargs):
+    def __init__(self, db, worker=None, **kwargs):
         super().__init__(**kwargs)
         self.db = db
+        self.worker = worker or DatabaseWorker(db)
+        self.pending_requests = 0
+        # Timing of the current/last refresh (a burst of run_db calls until
+        # none are pending), split into DB thread and main-thread widget time
+        self.refresh_timing = None
+        self.last_refresh = None
         self.build_ui()
+        
+        # Shown at the right of the header while DB requests are in flight
+        self.loading_label = Label(
+            text='',
+            font_size='12sp',
+            color=(0.5, 0.5, 0.5, 1),
+            size_hint_x=None,
+            width=dp(70)
+        )
+        self.header.add_widget(self.loading_label)
+        
+        # Change events are emitted on the DB thread; handle them on the UI thread
+        db.add_listener(lambda event: Clock.schedule_once(
+            lambda dt: self.on_db_change(event), 0))
     
     def build_ui(self):
         self.main_layout = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
@@ -25,6 +51,76 @@ class BaseScreen(Screen):
         self.scroll.add_widget(self.content)
         self.main_layout.add_widget(self.scroll)
     
+    def run_db(self, fn, *args, on_result=None, on_error=None, **kwargs):
+        """Run a Database call on the worker thread, showing the loading
+        state until its result is back on the main thread"""
+        return self._run(self.worker.submit, fn, args, kwargs, on_result, on_error)
+    
+    def run_write(self, fn, *args, on_result=None, on_error=None, **kwargs):
+        """run_db for writes: ones made in quick succession are committed
+        together (DatabaseWorker.submit_write)"""
+        return self._run(self.worker.submit_write, fn, args, kwargs, on_result, on_error)
+    
+    def _run(self, submit, fn, args, kwargs, on_result, on_error):
+        self.set_loading(1)
+        timing = self.refresh_timing
+        db_seconds = [0.0]
+        
+        def timed(*args, **kwargs):
+            # Runs on the DB thread
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                db_seconds[0] = time.perf_counter() - start
+        
+        def deliver(callback, value):
+            timing['db'] += db_seconds[0]
+            self.set_loading(-1)
+            start = time.perf_counter()
+            try:
+                callback(value)
+            finally:
+                timing['ui'] += time.perf_counter() - start
+                timing['tail_start'] = time.perf_counter()
+        
+        def finish(result):
+            deliver(on_result or (lambda result: None), result)
+        
+        def fail(error):
+            deliver(on_error or (lambda error: self.show_message('Error', str(error))), error)
+        
+        return submit(timed, *args, on_result=finish, on_error=fail, **kwargs)
+    
+    def on_db_change(self, event):
+        """Patch this screen's in-memory model for a committed ChangeEvent"""
+        pass
+    
+    def set_loading(self, delta):
+        if delta > 0 and self.refresh_timing is None:
+            self.refresh_timing = {'db': 0.0, 'ui': 0.0, 'requests': 0, 'tail_start': None}
+        if delta > 0:
+            self.refresh_timing['requests'] += delta
+        self.pending_requests += delta
+        self.loading_label.text = 'Loading…' if self.pending_requests else ''
+        if not self.pending_requests:
+            # -1: after this frame's layout passes, before it is drawn
+            Clock.schedule_once(self.end_refresh, -1)
+    
+    def end_refresh(self, dt=None):
+        timing = self.refresh_timing
+        if self.pending_requests or timing is None:
+            return  # another request joined the refresh
+        if timing['tail_start'] is not None:
+            # Layout triggered by the last result counts as widget time
+            timing['ui'] += time.perf_counter() - timing['tail_start']
+        self.refresh_timing = None
+        self.last_refresh = {
+            'db_ms': timing['db'] * 1000,
+            'ui_ms': timing['ui'] * 1000,
+            'requests': timing['requests'],
+        }
+    
     def show_message(self, title, message):
         from widgets.popup_widgets import MessagePopup
         popup = MessagePopup(title=title, message=message)
@@ -1,8 +1,6 @@
 # screens/expense_screen.py
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.scrollview import ScrollView
 from kivy.metrics import dp
 from kivy.clock import Clock
 
@@ -11,12 +9,16 @@ from widgets.custom_widgets import (
     Card, PrimaryButton, SecondaryButton, 
     CustomTextInput, CustomSpinner, AmountLabel
 )
-from models import Expense, TransactionType
+from widgets.list_widgets import RecycleList, TransactionRow, expense_row
+from udhar.models import Expense, Money, TransactionType
 from utils import (
     get_current_date, validate_amount, 
     get_category_suggestions, format_currency, get_status_color
 )
 
+PAGE_SIZE = 50
+SEARCH_DELAY = 0.3
+
 class ExpenseScreen(BaseScreen):
     def build_ui(self):
         super().build_ui()
@@ -113,7 +115,7 @@ class ExpenseScreen(BaseScreen):
         
         # Transactions List
         list_card = Card(bg_color=(1, 1, 1, 1))
-        list_card.height = dp(400)
+        list_card.height = dp(450)
         list_card.add_widget(Label(
             text='Recent Transactions',
             font_size='16sp',
@@ -122,15 +124,27 @@ class ExpenseScreen(BaseScreen):
             height=dp(40)
         ))
         
-        self.transactions_layout = GridLayout(cols=1, spacing=dp(5), size_hint_y=None)
-        self.transactions_layout.bind(minimum_height=self.transactions_layout.setter('height'))
+        # Search runs once typing pauses, not on every keystroke
+        self.search_input = CustomTextInput(hint_text='Search category or note')
+        self.search_input.bind(text=self.on_search_text)
+        list_card.add_widget(self.search_input)
+        self.search_trigger = Clock.create_trigger(self.run_search, SEARCH_DELAY)
+        self.search_query = ''
         
-        scroll = ScrollView(size_hint=(1, 1))
-        scroll.add_widget(self.transactions_layout)
-        list_card.add_widget(scroll)
+        # Virtualized: rows are recycled TransactionRow widgets over plain dicts
+        self.transactions_list = RecycleList(TransactionRow, owner=self, row_height=dp(70),
+                                             key='exp_id')
+        self.transactions_list.bind(scroll_y=self.on_list_scroll)
+        list_card.add_widget(self.transactions_list)
         
         self.content.add_widget(list_card)
         
+        self.page_cursor = None
+        self.page_loading = False
+        # Bumped by load_list; pages requested before that are dropped
+        self.list_generation = 0
+        self.totals = None
+        
         # Load data
         Clock.schedule_once(lambda dt: self.load_data(), 0)
     
@@ -154,10 +168,13 @@ class ExpenseScreen(BaseScreen):
             transaction_type=TransactionType(self.type_spinner.text)
         )
         
-        self.db.add_expense(expense)
+        self.run_write(self.db.add_expense, expense,
+                    on_result=lambda expense_id: self.on_transaction_added())
+    
+    def on_transaction_added(self):
+        # The list and totals are patched by the resulting change event
         self.show_message('Success', 'Transaction added!')
         self.clear_form()
-        self.load_data()
     
     def clear_form(self, instance=None):
         self.amount_input.text = ''
@@ -166,69 +183,123 @@ class ExpenseScreen(BaseScreen):
         self.date_input.text = get_current_date()
     
     def load_data(self):
-        # Clear existing
-        self.transactions_layout.clear_widgets()
-        
-        expenses = self.db.get_expenses()
-        total_income = 0
-        total_expense = 0
-        
-        for exp in expenses[:50]:  # Show last 50
-            exp_id, amount, cat, desc, date, trans_type, created = exp
-            
-            if trans_type == 'income':
-                total_income += amount
-                color = (0.2, 0.7, 0.2, 1)
-                sign = '+'
-            else:
-                total_expense += amount
-                color = (0.9, 0.2, 0.2, 1)
-                sign = '-'
-            
-            # Transaction item
-            item = Card(
-                bg_color=(0.98, 0.98, 0.98, 1),
-                radius=[dp(5)]
-            )
-            item.height = dp(70)
-            
-            # Top row: Date and Amount
-            top_row = BoxLayout(size_hint_y=None, height=dp(30))
-            top_row.add_widget(Label(
-                text=date,
-                font_size='12sp',
-                color=(0.5, 0.5, 0.5, 1),
-                halign='left'
-            ))
-            top_row.add_widget(Label(
-                text=f'{sign}{format_currency(amount)}',
-                font_size='14sp',
-                bold=True,
-                color=color,
-                halign='right'
-            ))
-            item.add_widget(top_row)
-            
-            # Bottom row: Category and Description
-            bottom_row = BoxLayout(size_hint_y=None, height=dp(30))
-            bottom_row.add_widget(Label(
-                text=f'{cat} • {desc[:20]}',
-                font_size='12sp',
-                color=(0.3, 0.3, 0.3, 1),
-                halign='left'
-            ))
-            item.add_widget(bottom_row)
-            
-            # Make clickable for delete
-            item.bind(on_touch_down=lambda touch, exp_id=exp_id: self.on_item_touch(touch, exp_id))
-            
-            self.transactions_layout.add_widget(item)
-        
-        # Update summary
-        net = total_income - total_expense
+        self.load_list()
+        self.run_db(self.db.get_totals, on_result=self.update_summary)
+    
+    def load_list(self):
+        # Start again from the newest page, or the best search matches
+        self.list_generation += 1
+        generation = self.list_generation
+        self.page_cursor = None
+        self.page_loading = True
+        if self.search_query:
+            self.run_db(self.db.search, self.search_query, limit=PAGE_SIZE, scope='expenses',
+                        on_result=lambda page: self.show_search_page(page, generation, reset=True))
+            return
+        self.run_db(self.db.get_expenses_page, limit=PAGE_SIZE,
+                    on_result=lambda page: self.show_page(page, generation, reset=True))
+    
+    def load_more(self):
+        if self.page_cursor is None or self.page_loading:
+            return
+        generation = self.list_generation
+        self.page_loading = True
+        if self.search_query:
+            self.run_db(self.db.search, self.search_query, limit=PAGE_SIZE,
+                        cursor=self.page_cursor, scope='expenses',
+                        on_result=lambda page: self.show_search_page(page, generation))
+            return
+        self.run_db(self.db.get_expenses_page, after=self.page_cursor, limit=PAGE_SIZE,
+                    on_result=lambda page: self.show_page(page, generation))
+    
+    def on_search_text(self, instance, text):
+        # Restart the delay so only the final text is searched
+        self.search_trigger.cancel()
+        self.search_trigger()
+    
+    def run_search(self, dt=None):
+        self.search_query = self.search_input.text.strip()
+        self.load_list()
+    
+    def show_search_page(self, page, generation, reset=False):
+        results, cursor = page
+        self.show_page(([row for table, row in results], cursor), generation, reset=reset)
+    
+    def show_page(self, page, generation, reset=False):
+        if generation != self.list_generation:
+            return  # superseded: the list was reloaded or searched since
+        expenses, self.page_cursor = page
+        self.page_loading = False
+        rows = [expense_row(exp) for exp in expenses]
+        if reset:
+            self.transactions_list.set_rows(rows)
+        else:
+            self.transactions_list.extend_rows(rows)
+    
+    def on_list_scroll(self, scroll, scroll_y):
+        # scroll_y reaches 0 at the bottom of the list
+        if scroll_y <= 0 and self.page_cursor is not None:
+            self.load_more()
+    
+    def on_db_change(self, event):
+        if event.action == 'over_budget':
+            # Expenses are added here, so this screen owns the warning
+            status = event.row
+            self.show_message('Over budget', (
+                f'{status.category} spending this month is '
+                f'{format_currency(status.spent)}\n'
+                f'against a budget of {format_currency(status.limit)}'))
+            return
+        if event.table != 'expenses':
+            return
+        if event.action == 'reload':
+            self.load_data()
+            return
+        if event.action not in ('insert', 'delete'):
+            return
+        row = event.row
+        
+        if self.totals is not None:
+            # Exact paise, so any number of patches still matches get_totals()
+            delta = Money.of(row.amount)
+            if event.action == 'delete':
+                delta = -delta
+            key = 'total_income' if row.transaction_type == 'income' else 'total_expense'
+            totals = dict(self.totals)
+            totals[key] += delta
+            self.show_totals(totals)
+        
+        if self.search_query:
+            # Ranked results can't be patched in place; search again
+            self.load_list()
+            return
+        
+        transactions = self.transactions_list
+        data = transactions.data
+        if event.action == 'insert':
+            # Newest first, so a new entry almost always lands at the top
+            index = 0
+            while index < len(data) and (data[index]['date'], data[index]['exp_id']) > (row.date, row.id):
+                index += 1
+            if index == len(data) and self.page_cursor is not None:
+                return  # belongs to a page that has not been loaded yet
+            transactions.insert_row(index, expense_row(row))
+        else:
+            # Found through the id index; the list shift is still O(n)
+            transactions.remove_row(row.id)
+    
+    def update_summary(self, totals):
+        """Show get_totals() output; kept as Money for patching"""
+        self.show_totals({key: Money.of(totals[key])
+                          for key in ('total_income', 'total_expense')})
+    
+    def show_totals(self, totals):
+        self.totals = totals
+        income, expense = totals['total_income'], totals['total_expense']
+        net = (income - expense).rupees
         self.summary_label.text = (
-            f'Income: {format_currency(total_income)} | '
-            f'Expense: {format_currency(total_expense)}\n'
+            f'Income: {format_currency(income.rupees)} | '
+            f'Expense: {format_currency(expense.rupees)}\n'
             f'Net: {format_currency(net)}'
         )
         self.summary_label.color = (0.2, 0.7, 0.2, 1) if net >= 0 else (0.9, 0.2, 0.2, 1)
@@ -242,5 +313,4 @@ class ExpenseScreen(BaseScreen):
             )
     
     def delete_expense(self, exp_id):
-        self.db.delete_expense(exp_id)
-        self.load_data()
\ No newline at end of file
+        self.run_write(self.db.delete_expense, exp_id)
\ No newline at end of file
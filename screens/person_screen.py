@@ -0,0 +1,127 @@
+# screens/person_screen.py
+from kivy.uix.label import Label
+from kivy.metrics import dp
+
+from screens.base_screen import BaseScreen
+from widgets.custom_widgets import Card, SecondaryButton
+from widgets.list_widgets import RecycleList, HistoryRow, history_row
+from utils import format_currency
+
+PAGE_SIZE = 30
+
+class PersonScreen(BaseScreen):
+    """Drill-down for one person: balance summary plus a paged history of
+    their udhar records and payments"""
+    def build_ui(self):
+        super().build_ui()
+        self.person_name = None
+        self.page_cursor = None
+        self.page_loading = False
+        # Bumped by load_data; pages requested before that are dropped
+        self.list_generation = 0
+        
+        # Header
+        back_btn = SecondaryButton(text='‹ Back', size_hint_x=None, width=dp(80))
+        back_btn.bind(on_press=self.go_back)
+        self.header.add_widget(back_btn)
+        self.title_label = Label(
+            text='',
+            font_size='20sp',
+            bold=True,
+            color=(0.2, 0.2, 0.2, 1)
+        )
+        self.header.add_widget(self.title_label)
+        
+        # Balance summary
+        self.summary_card = Card(bg_color=(1, 0.95, 0.9, 1))
+        self.summary_card.height = dp(90)
+        self.summary_label = Label(
+            text='',
+            font_size='14sp',
+            bold=True,
+            color=(0.3, 0.3, 0.3, 1)
+        )
+        self.summary_card.add_widget(self.summary_label)
+        self.content.add_widget(self.summary_card)
+        
+        # History
+        list_card = Card(bg_color=(1, 1, 1, 1))
+        list_card.height = dp(450)
+        list_card.add_widget(Label(
+            text='History',
+            font_size='16sp',
+            bold=True,
+            size_hint_y=None,
+            height=dp(40)
+        ))
+        self.history_list = RecycleList(HistoryRow, owner=self, row_height=dp(65))
+        self.history_list.bind(scroll_y=self.on_list_scroll)
+        list_card.add_widget(self.history_list)
+        self.content.add_widget(list_card)
+    
+    def show_person(self, person_name):
+        self.person_name = person_name
+        self.title_label.text = person_name
+        self.summary_label.text = ''
+        self.history_list.data = []
+        self.load_data()
+    
+    def load_data(self):
+        if self.person_name is None:
+            return
+        self.list_generation += 1
+        generation = self.list_generation
+        self.page_cursor = None
+        self.page_loading = True
+        self.run_db(self.db.get_person_balances, self.person_name,
+                    on_result=self.update_summary)
+        self.run_db(self.db.get_person_history, self.person_name, limit=PAGE_SIZE,
+                    on_result=lambda page: self.show_page(page, generation, reset=True))
+    
+    def load_more(self):
+        if self.page_cursor is None or self.page_loading:
+            return
+        generation = self.list_generation
+        self.page_loading = True
+        self.run_db(self.db.get_person_history, self.person_name,
+                    after=self.page_cursor, limit=PAGE_SIZE,
+                    on_result=lambda page: self.show_page(page, generation))
+    
+    def show_page(self, page, generation, reset=False):
+        if generation != self.list_generation:
+            return  # superseded: another person, or reloaded since
+        entries, self.page_cursor = page
+        self.page_loading = False
+        rows = [history_row(entry) for entry in entries]
+        if reset:
+            self.history_list.data = rows
+        else:
+            self.history_list.data.extend(rows)
+    
+    def on_list_scroll(self, scroll, scroll_y):
+        if scroll_y <= 0 and self.page_cursor is not None:
+            self.load_more()
+    
+    def update_summary(self, balances):
+        if not balances:
+            self.summary_label.text = 'No records'
+            return
+        balance = balances[0]
+        text = (
+            f'Lent: {format_currency(balance["total_lent"])} | '
+            f'Paid: {format_currency(balance["total_paid"])}\n'
+            f'Outstanding: {format_currency(balance["outstanding"])}'
+        )
+        if balance['oldest_due_date']:
+            text += f'\nOldest due: {balance["oldest_due_date"]}'
+        self.summary_label.text = text
+    
+    def on_db_change(self, event):
+        if event.table != 'udhar' or self.person_name is None:
+            return
+        # Bulk 'reload' events carry no row
+        if event.row is None or event.row.person_name.strip().lower() == self.person_name.strip().lower():
+            self.load_data()
+    
+    def go_back(self, instance=None):
+        self.manager.current = 'udhar'
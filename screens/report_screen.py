@@ -1,14 +1,21 @@
 # screens/report_screen.py
+import calendar
+import math
+import os
+
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
+from kivy.uix.button import Button
 from kivy.uix.gridlayout import GridLayout
-from kivy.graphics import Color, Rectangle
+from kivy.uix.scrollview import ScrollView
 from kivy.metrics import dp
 from kivy.clock import Clock
 
 from screens.base_screen import BaseScreen
-from widgets.custom_widgets import Card, CustomSpinner, PrimaryButton
-from utils import get_month_options, format_currency, get_current_month
+from widgets.custom_widgets import Bar, Card, CustomSpinner, PrimaryButton, SecondaryButton
+from utils import get_month_options, format_currency, get_current_month, get_budget_color
+
+SINGLE_MONTH = 'Single month'
 
 class ReportScreen(BaseScreen):
     def build_ui(self):
@@ -24,7 +31,7 @@ class ReportScreen(BaseScreen):
         
         # Controls
         control_card = Card(bg_color=(0.98, 0.98, 0.98, 1))
-        control_card.height = dp(80)
+        control_card.height = dp(185)
         
         control_layout = BoxLayout(spacing=dp(10))
         control_layout.add_widget(Label(text='Month:', size_hint_x=None, width=dp(80)))
@@ -41,6 +48,31 @@ class ReportScreen(BaseScreen):
         control_layout.add_widget(gen_btn)
         
         control_card.add_widget(control_layout)
+        
+        # Range mode: pick an end month to report start..end as a trend
+        range_layout = BoxLayout(spacing=dp(10))
+        range_layout.add_widget(Label(text='To:', size_hint_x=None, width=dp(80)))
+        
+        self.end_spinner = CustomSpinner(
+            text=SINGLE_MONTH,
+            values=[SINGLE_MONTH] + get_month_options(),
+            size_hint_x=0.5
+        )
+        range_layout.add_widget(self.end_spinner)
+        
+        self.granularity_spinner = CustomSpinner(
+            text='month',
+            values=['month', 'week', 'day'],
+            size_hint_x=0.3
+        )
+        range_layout.add_widget(self.granularity_spinner)
+        
+        control_card.add_widget(range_layout)
+        
+        # Export the selected period's ledger rows
+        export_btn = SecondaryButton(text='Export CSV')
+        export_btn.bind(on_press=self.export_ledger)
+        control_card.add_widget(export_btn)
         self.content.add_widget(control_card)
         
         # Summary Cards
@@ -95,16 +127,68 @@ class ReportScreen(BaseScreen):
         self.cat_layout = GridLayout(cols=1, spacing=dp(2), size_hint_y=None)
         self.cat_layout.bind(minimum_height=self.cat_layout.setter('height'))
         
-        from kivy.uix.scrollview import ScrollView
         scroll = ScrollView(size_hint=(1, 1))
         scroll.add_widget(self.cat_layout)
         self.cat_card.add_widget(scroll)
         
         self.content.add_widget(self.cat_card)
         
+        # Insights from the columnar snapshot (udhar.analytics)
+        self.insights_card = Card(bg_color=(1, 1, 1, 1))
+        self.insights_card.height = dp(300)
+        self.insights_card.add_widget(Label(
+            text='Spending Insights',
+            font_size='16sp',
+            bold=True,
+            size_hint_y=None,
+            height=dp(40)
+        ))
+        self.insights_label = Label(
+            text='',
+            font_size='12sp',
+            color=(0.4, 0.4, 0.4, 1),
+            size_hint_y=None,
+            height=dp(30)
+        )
+        self.insights_card.add_widget(self.insights_label)
+        self.weekday_layout = GridLayout(cols=1, spacing=dp(2))
+        self.insights_card.add_widget(self.weekday_layout)
+        self.content.add_widget(self.insights_card)
+        # Built on the DB thread by the first load_insights
+        self.analytics = None
+        
+        # Trend (range mode only)
+        self.trend_card = Card(bg_color=(1, 1, 1, 1))
+        self.trend_card.height = dp(300)
+        self.trend_card.add_widget(Label(
+            text='Trend (income / expense)',
+            font_size='16sp',
+            bold=True,
+            size_hint_y=None,
+            height=dp(40)
+        ))
+        
+        self.trend_layout = GridLayout(cols=1, spacing=dp(2), size_hint_y=None)
+        self.trend_layout.bind(minimum_height=self.trend_layout.setter('height'))
+        
+        trend_scroll = ScrollView(size_hint=(1, 1))
+        trend_scroll.add_widget(self.trend_layout)
+        self.trend_card.add_widget(trend_scroll)
+        
+        # Set when data changes so the report regenerates on the next visit
+        self.stale = False
+        
         # Generate initial report
         Clock.schedule_once(lambda dt: self.generate_report(), 0)
     
+    def on_db_change(self, event):
+        self.stale = True
+    
+    def on_enter(self, *args):
+        if self.stale:
+            self.stale = False
+            self.generate_report()
+    
     def generate_report(self, instance=None):
         try:
             year, month = map(int, self.month_spinner.text.split('-'))
@@ -112,7 +196,68 @@ class ReportScreen(BaseScreen):
             self.show_message('Error', 'Invalid month format')
             return
         
-        summary = self.db.get_monthly_summary(year, month)
+        self.run_db(self.load_insights, *self.period_dates(),
+                    on_result=self.show_insights)
+        if self.end_spinner.text != SINGLE_MONTH:
+            self.generate_range_report()
+            return
+        self.run_db(self.db.get_monthly_summary, year, month,
+                    on_result=self.show_report)
+    
+    def period_dates(self):
+        """First and last day of the selected month or range"""
+        start = end = self.month_spinner.text
+        if self.end_spinner.text != SINGLE_MONTH:
+            start, end = sorted([start, self.end_spinner.text])
+        year, month = map(int, end.split('-'))
+        return f'{start}-01', f'{end}-{calendar.monthrange(year, month)[1]:02d}'
+    
+    def load_insights(self, start_date, end_date):
+        """Runs on the DB thread: bring the snapshot up to date (only new
+        rows are read) and query it"""
+        if self.analytics is None:
+            from udhar.analytics import ExpenseColumns
+            self.analytics = ExpenseColumns(self.db)
+        columns = self.analytics
+        columns.refresh()
+        return {
+            'percentiles': columns.percentiles((50, 90), start_date, end_date),
+            'largest': columns.largest(1, start_date, end_date),
+            'weekdays': columns.weekday_totals(start_date, end_date),
+        }
+    
+    def show_insights(self, insights):
+        percentiles = insights['percentiles']
+        if percentiles:
+            largest = insights['largest'][0][1]
+            self.insights_label.text = (
+                f'Typical {format_currency(percentiles[50])} • '
+                f'90% under {format_currency(percentiles[90])} • '
+                f'Largest {format_currency(largest)}')
+        else:
+            self.insights_label.text = 'No expenses in this period'
+        
+        self.weekday_layout.clear_widgets()
+        weekdays = insights['weekdays']
+        peak = max(total for _, total in weekdays)
+        for day, total in weekdays:
+            row = BoxLayout()
+            row.add_widget(Label(text=day, font_size='12sp', size_hint_x=0.2))
+            bar_container = BoxLayout(size_hint_x=0.5, padding=(0, dp(10)))
+            bar_container.add_widget(Bar(fraction=total / peak if peak else 0,
+                                         color=(0.2, 0.6, 0.9, 1)))
+            row.add_widget(bar_container)
+            row.add_widget(Label(
+                text=format_currency(total),
+                font_size='12sp',
+                size_hint_x=0.3,
+                color=(0.4, 0.4, 0.4, 1)
+            ))
+            self.weekday_layout.add_widget(row)
+    
+    def show_report(self, summary):
+        if self.trend_card.parent:
+            self.content.remove_widget(self.trend_card)
         
         # Update cards
         self.income_label.text = format_currency(summary['total_income'])
@@ -124,43 +269,157 @@ class ReportScreen(BaseScreen):
         
         self.udhar_label.text = format_currency(summary['pending_udhar'])
         
-        # Update category breakdown
+        self.show_categories(summary['total_expense'], summary['category_breakdown'],
+                             summary['budgets'])
+    
+    def show_categories(self, total, breakdown, budgets=None):
+        """Fill the Category Breakdown card. With budgets (single month),
+        budgeted categories show progress against their limit and names can
+        be tapped to edit it; without (a range), every row shows its share."""
         self.cat_layout.clear_widgets()
         
-        total = summary['total_expense']
-        for category, amount in summary['category_breakdown']:
+        breakdown = list(breakdown)
+        if budgets is not None:
+            # Budgeted categories with nothing spent yet still get a row
+            spent = {category for category, _ in breakdown}
+            breakdown += [(category, 0.0) for category in sorted(budgets) if category not in spent]
+        for category, amount in breakdown:
+            limit = budgets.get(category) if budgets else None
             percentage = (amount / total * 100) if total > 0 else 0
             
             row = BoxLayout(size_hint_y=None, height=dp(40))
             
-            # Category name
-            row.add_widget(Label(
-                text=category,
-                font_size='13sp',
-                halign='left',
-                size_hint_x=0.4
-            ))
-            
-            # Progress bar background
-            bar_container = BoxLayout(size_hint_x=0.4)
-            with bar_container.canvas:
-                Color(0.9, 0.9, 0.9, 1)
-                Rectangle(pos=bar_container.pos, size=bar_container.size)
-            
-            # Progress fill
-            bar_fill = BoxLayout()
-            bar_fill.width = 0  # Will be updated
-            bar_container.add_widget(bar_fill)
+            if budgets is None:
+                row.add_widget(Label(
+                    text=category,
+                    font_size='13sp',
+                    halign='left',
+                    size_hint_x=0.4
+                ))
+            else:
+                # Category name, tap to set its budget
+                name_btn = Button(
+                    text=category,
+                    font_size='13sp',
+                    size_hint_x=0.4,
+                    background_normal='',
+                    background_color=(0, 0, 0, 0),
+                    color=(1, 1, 1, 1)
+                )
+                name_btn.bind(on_press=lambda x, c=category, l=limit: self.edit_budget(c, l))
+                row.add_widget(name_btn)
             
+            # Progress against the budget, else share of the period's spending
+            bar_container = BoxLayout(size_hint_x=0.4, padding=(0, dp(12)))
+            if limit:
+                bar_container.add_widget(Bar(fraction=amount / limit,
+                                             color=get_budget_color(amount / limit)))
+                text = f'{format_currency(amount)} / {format_currency(limit)}'
+            else:
+                bar_container.add_widget(Bar(fraction=percentage / 100,
+                                             color=(0.9, 0.2, 0.2, 1)))
+                text = f'{format_currency(amount)} ({percentage:.0f}%)'
             row.add_widget(bar_container)
             
             # Amount
             row.add_widget(Label(
-                text=f'{format_currency(amount)} ({percentage:.0f}%)',
+                text=text,
                 font_size='12sp',
                 halign='right',
                 size_hint_x=0.3,
                 color=(0.4, 0.4, 0.4, 1)
             ))
             
-            self.cat_layout.add_widget(row)
\ No newline at end of file
+            self.cat_layout.add_widget(row)
+    
+    def edit_budget(self, category, limit):
+        from widgets.popup_widgets import InputPopup
+        current = f'now {format_currency(limit)}' if limit else 'none set'
+        popup = InputPopup(
+            title=f'Monthly Budget: {category}',
+            hint_text=f'Limit ({current}, 0 to remove)',
+            input_type='number',
+            on_submit=lambda val: self.save_budget(category, val)
+        )
+        popup.open()
+    
+    def save_budget(self, category, value):
+        try:
+            limit = float(value)
+        except ValueError:
+            limit = math.nan
+        if not math.isfinite(limit):
+            # 'nan' would otherwise fall through to removing the budget
+            self.show_message('Error', 'Invalid amount')
+            return
+        if limit > 0:
+            self.run_write(self.db.set_budget, category, limit,
+                           on_result=lambda result: self.generate_report())
+        else:
+            self.run_write(self.db.remove_budget, category,
+                           on_result=lambda result: self.generate_report())
+    
+    def generate_range_report(self):
+        start, end = sorted([self.month_spinner.text, self.end_spinner.text])
+        self.run_db(self.db.get_range_summary, start, end,
+                    granularity=self.granularity_spinner.text,
+                    on_result=self.show_range_report)
+    
+    def show_range_report(self, summary):
+        self.income_label.text = format_currency(summary['total_income'])
+        self.expense_label.text = format_currency(summary['total_expense'])
+        
+        savings = summary['net_savings']
+        self.savings_label.text = format_currency(savings)
+        self.savings_label.color = (0.2, 0.6, 0.2, 1) if savings >= 0 else (0.8, 0.2, 0.2, 1)
+        
+        self.udhar_label.text = format_currency(summary['pending_udhar'])
+        self.show_categories(summary['total_expense'], summary['category_breakdown'])
+        
+        if not self.trend_card.parent:
+            self.content.add_widget(self.trend_card)
+        self.trend_layout.clear_widgets()
+        
+        series = summary['series']
+        peak = max([max(p['income'], p['expense']) for p in series] + [0])
+        for point in series:
+            row = BoxLayout(size_hint_y=None, height=dp(36))
+            
+            row.add_widget(Label(
+                text=point['period'],
+                font_size='12sp',
+                size_hint_x=0.3
+            ))
+            
+            # Income over expense, scaled to the busiest period
+            bars = BoxLayout(orientation='vertical', size_hint_x=0.4, padding=(0, dp(6)))
+            bars.add_widget(Bar(fraction=point['income'] / peak if peak else 0,
+                                color=(0.2, 0.7, 0.2, 1)))
+            bars.add_widget(Bar(fraction=point['expense'] / peak if peak else 0,
+                                color=(0.9, 0.2, 0.2, 1)))
+            row.add_widget(bars)
+            
+            net = point['net']
+            row.add_widget(Label(
+                text=format_currency(net),
+                font_size='12sp',
+                size_hint_x=0.3,
+                color=(0.2, 0.6, 0.2, 1) if net >= 0 else (0.8, 0.2, 0.2, 1)
+            ))
+            
+            self.trend_layout.add_widget(row)
+    
+    def export_ledger(self, instance=None):
+        from udhar import exporter
+        
+        start_date, end_date = self.period_dates()
+        # Exports land next to the database, i.e. in the app's data dir
+        directory = os.path.join(os.path.dirname(self.db.db_path), 'exports')
+        self.run_db(exporter.export_ledger, self.db, directory, 'csv',
+                    start_date=start_date, end_date=end_date,
+                    on_result=self.on_exported)
+    
+    def on_exported(self, results):
+        lines = [f'{table}: {count} rows' for table, (path, count) in results.items()]
+        directory = os.path.dirname(next(iter(results.values()))[0])
+        self.show_message('Exported', '\n'.join(lines) + f'\n\n{directory}')
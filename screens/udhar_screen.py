@@ -1,8 +1,6 @@
 # screens/udhar_screen.py
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.scrollview import ScrollView
 from kivy.metrics import dp
 from kivy.clock import Clock
 
@@ -11,9 +9,13 @@ from widgets.custom_widgets import (
     Card, PrimaryButton, SecondaryButton, 
     CustomTextInput, StatusBadge
 )
-from models import Udhar, UdharStatus
+from widgets.list_widgets import RecycleList, UdharRow, udhar_row
+from udhar.models import Udhar, UdharStatus
 from utils import get_current_date, validate_amount, format_currency
 
+SEARCH_DELAY = 0.3
+SEARCH_LIMIT = 100
+
 class UdharScreen(BaseScreen):
     def build_ui(self):
         super().build_ui()
@@ -101,7 +103,7 @@ class UdharScreen(BaseScreen):
         
         # Udhar List
         list_card = Card(bg_color=(1, 1, 1, 1))
-        list_card.height = dp(400)
+        list_card.height = dp(450)
         list_card.add_widget(Label(
             text='Active Udhar Records',
             font_size='16sp',
@@ -110,15 +112,21 @@ class UdharScreen(BaseScreen):
             height=dp(40)
         ))
         
-        self.udhar_layout = GridLayout(cols=1, spacing=dp(5), size_hint_y=None)
-        self.udhar_layout.bind(minimum_height=self.udhar_layout.setter('height'))
+        # Search runs once typing pauses, not on every keystroke
+        self.search_input = CustomTextInput(hint_text='Search name or note')
+        self.search_input.bind(text=self.on_search_text)
+        list_card.add_widget(self.search_input)
+        self.search_trigger = Clock.create_trigger(self.run_search, SEARCH_DELAY)
+        self.search_query = ''
         
-        scroll = ScrollView(size_hint=(1, 1))
-        scroll.add_widget(self.udhar_layout)
-        list_card.add_widget(scroll)
+        # Virtualized: rows are recycled UdharRow widgets over plain dicts
+        self.udhar_list = RecycleList(UdharRow, owner=self, row_height=dp(120),
+                                      key='udhar_id')
+        list_card.add_widget(self.udhar_list)
         
         self.content.add_widget(list_card)
         
+        self.total_pending = 0
         Clock.schedule_once(lambda dt: self.load_data(), 0)
     
     def add_udhar(self, instance):
@@ -142,10 +150,13 @@ class UdharScreen(BaseScreen):
             status=UdharStatus.PENDING
         )
         
-        self.db.add_udhar(udhar)
+        self.run_write(self.db.add_udhar, udhar,
+                    on_result=lambda udhar_id: self.on_udhar_added(name))
+    
+    def on_udhar_added(self, name):
+        # The list is patched by the resulting change event
         self.show_message('Success', f'Udhar added for {name}')
         self.clear_form()
-        self.load_data()
     
     def clear_form(self, instance=None):
         self.name_input.text = ''
@@ -155,110 +166,76 @@ class UdharScreen(BaseScreen):
         self.date_input.text = get_current_date()
     
     def load_data(self):
-        self.udhar_layout.clear_widgets()
-        
-        udhar_list = self.db.get_udhar_list()
-        total_pending = 0
-        
-        for udhar in udhar_list:
-            udhar_id, person, amount, desc, date_given, due_date, status, paid, created = udhar
-            remaining = amount - paid
-            
-            if status in ['pending', 'partial']:
-                total_pending += remaining
-            
-            # Udhar Card
-            card = Card(bg_color=(0.98, 0.98, 0.98, 1), radius=[dp(8)])
-            card.height = dp(120)
-            
-            # Header with name and status
-            header = BoxLayout(size_hint_y=None, height=dp(35))
-            header.add_widget(Label(
-                text=person,
-                font_size='16sp',
-                bold=True,
-                halign='left',
-                color=(0.2, 0.2, 0.2, 1)
-            ))
-            
-            status_colors = {
-                'pending': (0.9, 0.2, 0.2, 1),
-                'partial': (0.9, 0.6, 0.1, 1),
-                'cleared': (0.2, 0.7, 0.2, 1)
-            }
-            status_label = Label(
-                text=status.upper(),
-                font_size='12sp',
-                bold=True,
-                color=status_colors.get(status, (0.5, 0.5, 0.5, 1)),
-                size_hint_x=None,
-                width=dp(80)
-            )
-            header.add_widget(status_label)
-            card.add_widget(header)
-            
-            # Amount details
-            amounts = BoxLayout(size_hint_y=None, height=dp(30))
-            amounts.add_widget(Label(
-                text=f'Total: {format_currency(amount)}',
-                font_size='13sp',
-                color=(0.4, 0.4, 0.4, 1)
-            ))
-            amounts.add_widget(Label(
-                text=f'Paid: {format_currency(paid)}',
-                font_size='13sp',
-                color=(0.2, 0.6, 0.2, 1)
-            ))
-            amounts.add_widget(Label(
-                text=f'Due: {format_currency(remaining)}',
-                font_size='13sp',
-                bold=True,
-                color=(0.9, 0.2, 0.2, 1)
-            ))
-            card.add_widget(amounts)
-            
-            # Date info
-            info = BoxLayout(size_hint_y=None, height=dp(25))
-            date_text = f'Given: {date_given}'
-            if due_date:
-                date_text += f' | Due: {due_date}'
-            info.add_widget(Label(
-                text=date_text,
-                font_size='11sp',
-                color=(0.5, 0.5, 0.5, 1),
-                halign='left'
-            ))
-            card.add_widget(info)
-            
-            # Action buttons
-            if status != 'cleared':
-                actions = BoxLayout(size_hint_y=None, height=dp(40), spacing=dp(5))
-                
-                pay_btn = SecondaryButton(
-                    text='Record Payment',
-                    size_hint_x=0.5
-                )
-                pay_btn.bind(on_press=lambda x, id=udhar_id, rem=remaining: 
-                           self.show_payment_popup(id, rem))
-                
-                full_btn = PrimaryButton(
-                    text='Mark Cleared',
-                    size_hint_x=0.5
-                )
-                full_btn.bind(on_press=lambda x, id=udhar_id, rem=remaining: 
-                            self.mark_cleared(id, rem))
-                
-                actions.add_widget(pay_btn)
-                actions.add_widget(full_btn)
-                card.add_widget(actions)
-            
-            # Long press to delete
-            card.bind(on_touch_down=lambda touch, id=udhar_id: 
-                     self.on_card_touch(touch, id))
-            
-            self.udhar_layout.add_widget(card)
+        self.run_db(self.db.get_udhar_list, on_result=self.show_udhar_list)
+    
+    def on_search_text(self, instance, text):
+        # Restart the delay so only the final text is searched
+        self.search_trigger.cancel()
+        self.search_trigger()
+    
+    def run_search(self, dt=None):
+        self.search_query = self.search_input.text.strip()
+        if not self.search_query:
+            self.load_data()
+            return
+        query = self.search_query
+        self.run_db(self.db.search, query, limit=SEARCH_LIMIT, scope='udhar',
+                    on_result=lambda page: self.show_search_results(page, query))
+    
+    def show_search_results(self, page, query):
+        if query != self.search_query:
+            return  # superseded by a newer search
+        results, cursor = page
+        # Only the list is filtered; the pending total still covers everyone
+        self.udhar_list.set_rows([udhar_row(row) for table, row in results])
+    
+    def refresh_total(self, balances):
+        self.total_pending = sum(person['outstanding'] for person in balances)
+        self.update_summary()
+    
+    def show_udhar_list(self, udhar_list):
+        rows = [udhar_row(udhar) for udhar in udhar_list]
+        self.total_pending = sum(row['remaining'] for row in rows if row['active'])
+        self.udhar_list.set_rows(rows)
+        self.update_summary()
+    
+    def update_summary(self):
+        self.summary_label.text = f'Total Pending: {format_currency(self.total_pending)}'
+    
+    def on_db_change(self, event):
+        if event.table != 'udhar':
+            return
+        if self.search_query:
+            # The visible list is a subset, so re-run the search and
+            # recompute the total rather than patching either
+            self.run_search()
+            self.run_db(self.db.get_person_balances, on_result=self.refresh_total)
+            return
+        if event.action == 'reload':
+            self.load_data()
+            return
+        udhar_list = self.udhar_list
+        udhar_id = event.row.id
         
-        self.summary_label.text = f'Total Pending: {format_currency(total_pending)}'
+        # Payments patch their row in place through the id index; only an
+        # insert or delete shifts the list
+        if event.action == 'delete':
+            previous = udhar_list.remove_row(udhar_id)
+        else:
+            row = udhar_row(event.row)
+            if row['active']:
+                self.total_pending += row['remaining']
+            previous = udhar_list.patch_row(udhar_id, row)
+            if previous is None:
+                # Newest first by date given
+                data = udhar_list.data
+                index = 0
+                while index < len(data) and data[index]['date_given'] > row['date_given']:
+                    index += 1
+                udhar_list.insert_row(index, row)
+        if previous is not None and previous['active']:
+            self.total_pending -= previous['remaining']
+        self.update_summary()
     
     def show_payment_popup(self, udhar_id, remaining):
         from widgets.popup_widgets import InputPopup
@@ -274,8 +251,7 @@ class UdharScreen(BaseScreen):
         if amount <= 0 or amount > max_amount:
             self.show_message('Error', 'Invalid amount')
             return
-        self.db.update_udhar_payment(udhar_id, amount)
-        self.load_data()
+        self.run_write(self.db.update_udhar_payment, udhar_id, amount)
     
     def mark_cleared(self, udhar_id, remaining):
         self.confirm_action(
@@ -285,8 +261,12 @@ class UdharScreen(BaseScreen):
         )
     
     def clear_udhar(self, udhar_id, remaining):
-        self.db.update_udhar_payment(udhar_id, remaining)
-        self.load_data()
+        self.run_write(self.db.update_udhar_payment, udhar_id, remaining)
+    
+    def open_person(self, person_name):
+        person_screen = self.manager.get_screen('person')
+        person_screen.show_person(person_name)
+        self.manager.current = 'person'
     
     def on_card_touch(self, touch, udhar_id):
         if touch.is_double_tap:
@@ -297,5 +277,4 @@ class UdharScreen(BaseScreen):
             )
     
     def delete_udhar(self, udhar_id):
-        self.db.delete_udhar(udhar_id)
-        self.load_data()
\ No newline at end of file
+        self.run_write(self.db.delete_udhar, udhar_id)
\ No newline at end of file
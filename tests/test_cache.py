@@ -0,0 +1,132 @@
+# tests/test_cache.py
+"""QueryCache eviction/invalidation and the cached Database readers.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from udhar.cache import QueryCache
+from udhar.database import Database
+from udhar.models import Expense, TransactionType, Udhar, UdharStatus
+
+
+def expense(amount, day, category='Food', kind=TransactionType.EXPENSE):
+    return Expense(None, amount, category, '', day, kind)
+
+
+class QueryCacheTest(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = QueryCache(max_entries=2)
+        for key in ('a', 'b'):
+            cache.put(key, [('expenses', None, None)], key.upper(), cache.version)
+        self.assertEqual(cache.get('a'), (True, 'A'))  # 'b' is now least recent
+        cache.put('c', [('expenses', None, None)], 'C', cache.version)
+        self.assertEqual(cache.get('b'), (False, None))
+        self.assertEqual(cache.get('a'), (True, 'A'))
+        self.assertEqual(cache.get('c'), (True, 'C'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_invalidate_by_table_and_month(self):
+        cache = QueryCache()
+        version = cache.version
+        cache.put('may', [('expenses', '2024-05', '2024-05')], 1, version)
+        cache.put('june', [('expenses', '2024-06', '2024-06')], 2, version)
+        cache.put('spring', [('expenses', '2024-03', '2024-05')], 3, version)
+        cache.put('from_june', [('expenses', '2024-06', None)], 4, version)
+        cache.put('udhar', [('udhar', None, None)], 5, version)
+
+        cache.invalidate('expenses', '2024-06')
+        self.assertTrue(cache.get('may')[0])
+        self.assertTrue(cache.get('spring')[0])
+        self.assertTrue(cache.get('udhar')[0])
+        self.assertFalse(cache.get('june')[0])
+        self.assertFalse(cache.get('from_june')[0])
+
+        # No month: every span on the table
+        cache.invalidate('expenses')
+        self.assertFalse(cache.get('may')[0])
+        self.assertFalse(cache.get('spring')[0])
+        self.assertTrue(cache.get('udhar')[0])
+
+    def test_put_after_invalidation_is_dropped(self):
+        cache = QueryCache()
+        version = cache.version
+        # A write commits while the query that read the old state runs
+        cache.invalidate('expenses', '2024-06')
+        cache.put('june', [('expenses', '2024-06', '2024-06')], 'stale', version)
+        self.assertEqual(cache.get('june'), (False, None))
+
+
+class DatabaseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.directory.name, 'cache.db'))
+        self.db.add_expense(expense(100.0, '2024-05-10'))
+        self.db.add_expense(expense(200.0, '2024-06-10'))
+
+    def tearDown(self):
+        self.db.close()
+        self.directory.cleanup()
+
+    def test_repeated_read_is_a_hit(self):
+        first = self.db.get_monthly_summary(2024, 6)
+        hits = self.db.cache_stats()['hits']
+        self.assertIs(self.db.get_monthly_summary(2024, 6), first)
+        self.assertEqual(self.db.cache_stats()['hits'], hits + 1)
+
+    def test_write_invalidates_only_its_month(self):
+        may = self.db.get_monthly_summary(2024, 5)
+        self.db.get_monthly_summary(2024, 6)
+        self.db.add_expense(expense(50.0, '2024-06-11'))
+
+        self.assertIs(self.db.get_monthly_summary(2024, 5), may)
+        self.assertEqual(self.db.get_monthly_summary(2024, 6)['total_expense'], 250.0)
+
+    def test_delete_and_udhar_writes_invalidate(self):
+        self.assertEqual(self.db.get_categories(), ['Food'])
+        expense_id = self.db.add_expense(expense(10.0, '2024-06-12', 'Rent'))
+        self.assertEqual(self.db.get_categories(), ['Food', 'Rent'])
+        self.db.delete_expense(expense_id)
+        self.assertEqual(self.db.get_categories(), ['Food'])
+
+        self.assertEqual(self.db.get_monthly_summary(2024, 6)['pending_udhar'], 0.0)
+        udhar_id = self.db.add_udhar(Udhar(None, 'Ravi', 500.0, '', '2024-01-01', None,
+                                           UdharStatus.PENDING, 0.0))
+        self.assertEqual(self.db.get_monthly_summary(2024, 6)['pending_udhar'], 500.0)
+        self.db.update_udhar_payment(udhar_id, 125.5)
+        self.assertEqual(self.db.get_monthly_summary(2024, 6)['pending_udhar'], 374.5)
+
+    def test_bulk_insert_invalidates(self):
+        self.db.get_monthly_summary(2024, 6)
+        self.db.add_expenses_bulk([expense(1.0, '2024-06-20')] * 5, chunk_size=2)
+        self.assertEqual(self.db.get_monthly_summary(2024, 6)['total_expense'], 205.0)
+
+    def test_reads_inside_a_session_bypass_the_cache(self):
+        self.db.get_monthly_summary(2024, 6)
+        with self.assertRaises(RuntimeError):
+            with self.db.session(immediate=True) as conn:
+                conn.execute("UPDATE monthly_rollup SET total = 0")
+                # The uncommitted state is seen, not the cached result...
+                self.assertEqual(self.db.get_monthly_summary(2024, 6)['total_expense'], 0.0)
+                raise RuntimeError("roll back")
+        # ...and was not stored
+        self.assertEqual(self.db.get_monthly_summary(2024, 6)['total_expense'], 200.0)
+
+    def test_disabled_cache(self):
+        db = Database(os.path.join(self.directory.name, 'uncached.db'), cache_size=0)
+        try:
+            self.assertIsNone(db.cache_stats())
+            db.add_expense(expense(1.0, '2024-06-01'))
+            self.assertEqual(db.get_monthly_summary(2024, 6)['total_expense'], 1.0)
+        finally:
+            db.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# tests/test_concurrency.py
+"""Concurrent writers on separate pooled connections.
+
+Each thread gets its own connection from Database.get_connection, so
+writes only serialize through SQLite's lock. Write sessions take it with
+BEGIN IMMEDIATE; a deferred BEGIN fails with "database is locked" when
+its lock upgrade collides with another writer.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from udhar.database import LEGACY_PROFILE, Database
+from udhar.models import Expense, TransactionType, Udhar, UdharStatus
+
+THREADS = 4
+WRITES = 150
+
+
+def run_threads(target, count=THREADS):
+    errors = []
+
+    def worker(index):
+        try:
+            target(index)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+class ConcurrentWriteTest(unittest.TestCase):
+    profile = None
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, 'concurrent.db')
+        self.db = Database(path, profile=self.profile) if self.profile else Database(path)
+
+    def tearDown(self):
+        self.db.close()
+        self.directory.cleanup()
+
+    def test_add_and_delete_expenses(self):
+        def write(index):
+            for n in range(WRITES):
+                expense_id = self.db.add_expense(Expense(
+                    None, 1.25, f'Cat{index}', '', f'2024-0{index + 1}-15',
+                    TransactionType.EXPENSE))
+                if n % 3 == 0:
+                    self.db.delete_expense(expense_id)
+
+        self.assertEqual(run_threads(write), [])
+        kept = THREADS * (WRITES - len(range(0, WRITES, 3)))
+        self.assertEqual(len(self.db.get_expenses()), kept)
+        self.assertEqual(self.db.get_totals()['total_expense'], kept * 1.25)
+        self.assertEqual(self.db.check_monthly_rollup(), [])
+
+    def test_concurrent_payments(self):
+        udhar_ids = [self.db.add_udhar(Udhar(None, f'P{n}', 1000.0, '', '2024-01-01', None,
+                                             UdharStatus.PENDING, 0.0))
+                     for n in range(THREADS)]
+
+        def pay(index):
+            for n in range(WRITES):
+                # Every thread pays into every loan
+                self.db.update_udhar_payment(udhar_ids[(index + n) % THREADS], 1.0)
+
+        self.assertEqual(run_threads(pay), [])
+        for udhar in self.db.get_udhar_list():
+            self.assertEqual(udhar.amount_paid, WRITES)
+            self.assertEqual(udhar.status, 'partial')
+        self.assertEqual(self.db.reconcile_udhar_payments(fix=False), [])
+
+
+class LegacyProfileConcurrentWriteTest(ConcurrentWriteTest):
+    profile = LEGACY_PROFILE
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+# tests/test_import_export.py
+"""Exports read back by the importer give the same ledger.
+
+    python -m pytest tests
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from udhar.database import Database
+from udhar.exporter import export_table, read_columnar
+from udhar.importer import import_file
+from udhar.models import Expense, TransactionType, Udhar, UdharStatus
+
+
+class RoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = self.open_db('source.db')
+        for n in range(1, 31):
+            self.source.add_expense(Expense(
+                None, round(n * 10.37, 2), ('Food', 'Chai, snacks', 'Rent')[n % 3],
+                f'item "{n}" ₹', f'2024-{n % 12 + 1:02d}-{n % 28 + 1:02d}',
+                TransactionType.INCOME if n % 5 == 0 else TransactionType.EXPENSE))
+        for n, paid in enumerate((0.0, 12.5, 300.0)):
+            self.source.add_udhar(Udhar(None, f'Person {n}', 300.0, '', '2024-02-01',
+                                        '2024-03-01' if n else None,
+                                        UdharStatus.PENDING, 0.0))
+            if paid:
+                self.source.update_udhar_payment(n + 1, paid)
+
+    def tearDown(self):
+        self.source.close()
+        self.directory.cleanup()
+
+    def open_db(self, name):
+        db = Database(os.path.join(self.directory.name, name))
+        self.addCleanup(db.close)
+        return db
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def expenses(self, db):
+        return sorted(row[1:] for row in db.get_expenses())
+
+    def udhar(self, db):
+        return sorted(row[1:] for row in db.get_udhar_list())
+
+    def test_csv_and_jsonl(self):
+        for fmt in ('csv', 'jsonl'):
+            with self.subTest(fmt=fmt):
+                target = self.open_db(f'{fmt}.db')
+                for table in ('expenses', 'udhar'):
+                    path = self.path(f'{table}.{fmt}')
+                    self.assertGreater(export_table(self.source, table, path, fmt), 0)
+                    report = import_file(target, path, table)
+                    self.assertEqual(report.errors, [])
+                self.assertEqual(self.expenses(target), self.expenses(self.source))
+                self.assertEqual(self.udhar(target), self.udhar(self.source))
+                self.assertEqual(target.get_totals(), self.source.get_totals())
+                self.assertEqual(target.check_monthly_rollup(), [])
+                self.assertEqual(target.reconcile_udhar_payments(fix=False), [])
+
+    def test_columnar(self):
+        path = self.path('expenses.udc')
+        self.assertEqual(export_table(self.source, 'expenses', path, 'columnar'), 30)
+        rows = list(read_columnar(path))
+        self.assertEqual([tuple(row.values()) for row in rows],
+                         sorted(self.source.get_expenses()))
+
+    def test_filtered_export(self):
+        path = self.path('food.csv')
+        count = export_table(self.source, 'expenses', path, 'csv',
+                             start_date='2024-03-01', end_date='2024-06-30', category='Food')
+        expected = self.source.get_expenses('2024-03-01', '2024-06-30', 'Food')
+        self.assertEqual(count, len(expected))
+
+    def test_bad_records_are_reported(self):
+        path = self.path('mixed.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in ({'amount': '12.50', 'category': 'Food', 'date': '2024-01-02'},
+                           {'amount': 'nan', 'category': 'Food', 'date': '2024-01-02'},
+                           {'amount': '5', 'category': 'Food', 'date': '2024-02-30'},
+                           [1, 2],
+                           {'amount': '5', 'category': '', 'date': '2024-01-02'}):
+                f.write(json.dumps(record) + '\n')
+            f.write('{not json\n')
+        target = self.open_db('mixed.db')
+        report = import_file(target, path)
+        self.assertEqual(report.imported, 1)
+        self.assertEqual([line for line, _ in report.errors], [2, 3, 4, 5, 6])
+        self.assertIn('expected an object', report.errors[2][1])
+        self.assertEqual(target.get_totals()['total_expense'], 12.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
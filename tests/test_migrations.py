@@ -0,0 +1,91 @@
+# tests/test_migrations.py
+"""Upgrading a database written by the original app (user_version 0,
+REAL rupee amounts) through every migration.
+
+    python -m pytest tests
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from udhar.database import MIGRATIONS, Database
+from udhar.models import Expense, TransactionType
+
+
+class BaselineMigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'udhar_expense.db')
+        # Migration 1 is the original app's schema, statement for statement
+        conn = sqlite3.connect(self.path)
+        for statement in MIGRATIONS[0]:
+            conn.execute(statement)
+        conn.executemany(
+            "INSERT INTO expenses (amount, category, description, date, transaction_type) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(0.1, 'Food', 'Chai', '2024-01-05', 'expense'),
+             (0.2, 'Food', 'Biscuits', '2024-01-06', 'expense'),
+             (19.99, 'Travel', 'Bus pass', '2024-02-01', 'expense'),
+             (25000.0, 'Salary', '', '2024-01-31', 'income')])
+        conn.execute(
+            "INSERT INTO udhar (person_name, amount, description, date_given, due_date, "
+            "status, amount_paid) VALUES ('Ravi', 1000.0, 'Rent share', '2024-01-10', "
+            "NULL, 'partial', 250.5)")
+        conn.execute("INSERT INTO udhar_payments (udhar_id, amount, payment_date) "
+                     "VALUES (1, 250.5, '2024-01-20')")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def open(self):
+        db = Database(self.path)
+        self.addCleanup(db.close)
+        return db
+
+    def test_upgrade(self):
+        db = self.open()
+        self.assertEqual(db.schema_version(), len(MIGRATIONS))
+
+        with db.session() as conn:
+            self.assertEqual(conn.execute("SELECT amount FROM expenses ORDER BY id").fetchall(),
+                             [(10,), (20,), (1999,), (2500000,)])
+            self.assertEqual(conn.execute("SELECT amount, amount_paid FROM udhar").fetchone(),
+                             (100000, 25050))
+            self.assertEqual(conn.execute("PRAGMA foreign_key_check").fetchall(), [])
+            self.assertEqual(conn.execute("PRAGMA integrity_check").fetchone(), ('ok',))
+
+        january = db.get_monthly_summary(2024, 1)
+        self.assertEqual(january['total_expense'], 0.3)
+        self.assertEqual(january['total_income'], 25000.0)
+        self.assertEqual(january['pending_udhar'], 749.5)
+        self.assertEqual(db.check_monthly_rollup(), [])
+        self.assertEqual(db.reconcile_udhar_payments(fix=False), [])
+        if db.has_search_index():
+            self.assertEqual([row.description for _, row in db.search('bus')[0]], ['Bus pass'])
+
+        # The rebuilt tables keep their triggers for new writes
+        db.add_expense(Expense(None, 0.7, 'Food', 'Chai', '2024-01-07', TransactionType.EXPENSE))
+        self.assertEqual(db.get_monthly_summary(2024, 1)['total_expense'], 1.0)
+        self.assertEqual(db.check_monthly_rollup(), [])
+
+    def test_reopen_is_a_no_op(self):
+        self.open().close()
+        with sqlite3.connect(self.path) as conn:
+            schema = conn.execute("SELECT sql FROM sqlite_master ORDER BY name").fetchall()
+        db = self.open()
+        self.assertEqual(db.schema_version(), len(MIGRATIONS))
+        self.assertEqual(db.get_totals()['total_expense'], 20.29)
+        with db.session() as conn:
+            self.assertEqual(conn.execute("SELECT sql FROM sqlite_master ORDER BY name").fetchall(),
+                             schema)
+
+
+if __name__ == '__main__':
+    unittest.main()
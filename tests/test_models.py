@@ -0,0 +1,67 @@
+# tests/test_models.py
+"""Money conversion/rounding and the shared amount validator.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import unittest
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from udhar.models import Money, validate_amount
+
+
+class MoneyTest(unittest.TestCase):
+    def test_rounds_half_up_to_the_paisa(self):
+        self.assertEqual(Money.of(0.1 + 0.2).paise, 30)
+        # 2.675 is 2.67499999... as a binary float; the typed value wins
+        self.assertEqual(Money.of(2.675).paise, 268)
+        self.assertEqual(Money.of('0.005').paise, 1)
+        self.assertEqual(Money.of('0.004').paise, 0)
+        self.assertEqual(Money.of(-1.005).paise, -101)
+        self.assertEqual(Money.of(Decimal('19.999')).paise, 2000)
+        self.assertEqual(Money.of(7).paise, 700)
+
+    def test_rejects_non_numbers(self):
+        for value in ('abc', '', float('nan'), float('inf'), '-inf', '1e400000'):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    Money.of(value)
+
+    def test_arithmetic_is_exact(self):
+        total = Money()
+        for _ in range(10):
+            total = total + Money.of(0.1)
+        self.assertEqual(total, Money.of(1))
+        self.assertEqual((total - Money.of(0.3)).rupees, 0.7)
+        self.assertEqual(-Money.of(5), Money(-500))
+        self.assertFalse(Money.of(0.001))
+        self.assertIs(Money.of(total), total)
+
+    def test_str(self):
+        self.assertEqual(str(Money.of(1234567.5)), '₹1,234,567.50')
+        self.assertEqual(str(Money.of(-0.05)), '-₹0.05')
+
+
+class ValidateAmountTest(unittest.TestCase):
+    def test_valid(self):
+        self.assertEqual(validate_amount('12.50'), (True, 12.5))
+        self.assertEqual(validate_amount(' 3 '), (True, 3.0))
+        self.assertEqual(validate_amount('0', allow_zero=True), (True, 0.0))
+
+    def test_invalid(self):
+        for value in ('', 'abc', '0', '-1', 'nan', 'inf', '-inf'):
+            with self.subTest(value=value):
+                self.assertEqual(validate_amount(value), (False, 0))
+        self.assertEqual(validate_amount('-0.5', allow_zero=True), (False, 0))
+
+    def test_utils_reexport(self):
+        import utils
+        self.assertIs(utils.validate_amount, validate_amount)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# tests/test_query_plans.py
+"""EXPLAIN QUERY PLAN checks for the indexes added in migration 2.
+
+Each test records the SQL a Database method actually runs (through the
+connection's trace callback, with parameters bound) and asserts that
+SQLite answers it with a SEARCH on the index meant for it.
+
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from udhar.database import Database
+from udhar.models import Expense, TransactionType, Udhar, UdharStatus
+
+
+class QueryPlanTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        # Uncached, so every call reaches SQLite
+        self.db = Database(os.path.join(self.directory.name, 'plans.db'), cache_size=0)
+        for day in range(1, 29):
+            self.db.add_expense(Expense(None, 100.0 + day, ('Food', 'Rent')[day % 2], '',
+                                        f'2024-02-{day:02d}', TransactionType.EXPENSE))
+        self.udhar_id = self.db.add_udhar(Udhar(None, 'Ravi', 500.0, '', '2024-02-01', None,
+                                                UdharStatus.PENDING, 0.0))
+        self.db.update_udhar_payment(self.udhar_id, 100.0)
+
+    def tearDown(self):
+        self.db.close()
+        self.directory.cleanup()
+
+    def statements(self, call, prefix):
+        """SQL run by call() that starts with prefix"""
+        seen = []
+        conn = self.db.get_connection()
+        conn.set_trace_callback(seen.append)
+        try:
+            call()
+        finally:
+            conn.set_trace_callback(None)
+        matching = [sql for sql in seen if sql.lstrip().upper().startswith(prefix)]
+        self.assertTrue(matching, f"no {prefix} statement ran")
+        return matching
+
+    def assertSearches(self, sql, table, index):
+        plan = self.db.explain_query_plan(sql)
+        self.assertTrue(
+            any(step.startswith(f'SEARCH {table} USING') and f'INDEX {index} ' in step
+                for step in plan),
+            f"expected a SEARCH on {index}, got {plan} for {sql}")
+
+    def test_get_expenses_date_range(self):
+        for sql in self.statements(
+                lambda: self.db.get_expenses('2024-02-01', '2024-02-15'), 'SELECT'):
+            self.assertSearches(sql, 'expenses', 'idx_expenses_date_id')
+
+    def test_get_expenses_category(self):
+        for sql in self.statements(
+                lambda: self.db.get_expenses(category='Food'), 'SELECT'):
+            self.assertSearches(sql, 'expenses', 'idx_expenses_category_date')
+
+    def test_get_expenses_page(self):
+        rows, cursor = self.db.get_expenses_page(limit=5)
+        for sql in self.statements(
+                lambda: self.db.get_expenses_page(after=cursor, limit=5), 'SELECT'):
+            self.assertSearches(sql, 'expenses', 'idx_expenses_date_id')
+
+    def test_get_udhar_list_by_status(self):
+        for sql in self.statements(
+                lambda: self.db.get_udhar_list(status='partial'), 'SELECT'):
+            self.assertSearches(sql, 'udhar', 'idx_udhar_status_date')
+
+    def test_payments_by_udhar_id(self):
+        for sql in self.statements(
+                lambda: self.db.delete_udhar(self.udhar_id), 'DELETE FROM UDHAR_PAYMENTS'):
+            self.assertSearches(sql, 'udhar_payments', 'idx_udhar_payments_udhar')
+
+
+if __name__ == '__main__':
+    unittest.main()
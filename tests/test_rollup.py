@@ -0,0 +1,105 @@
+# tests/test_rollup.py
+"""monthly_rollup must always equal the grouped raw expenses.
+
+Every write path (single inserts, deletes, updates, bulk inserts) goes
+through check_monthly_rollup(), which reports any drifted group.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from udhar.database import Database
+from udhar.models import Expense, TransactionType
+
+
+def expense(amount, day, category='Food', kind=TransactionType.EXPENSE):
+    return Expense(None, amount, category, '', day, kind)
+
+
+class RollupTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.directory.name, 'rollup.db'))
+
+    def tearDown(self):
+        self.db.close()
+        self.directory.cleanup()
+
+    def rollup(self):
+        with self.db.session() as conn:
+            return conn.execute(
+                "SELECT year_month, transaction_type, category, total, count "
+                "FROM monthly_rollup ORDER BY 1, 2, 3").fetchall()
+
+    def test_insert_and_delete_triggers(self):
+        first = self.db.add_expense(expense(10.25, '2024-05-01'))
+        self.db.add_expense(expense(0.1, '2024-05-31'))
+        self.db.add_expense(expense(0.2, '2024-06-01'))
+        self.db.add_expense(expense(500.0, '2024-05-15', 'Salary', TransactionType.INCOME))
+        self.assertEqual(self.rollup(), [
+            ('2024-05', 'expense', 'Food', 1035, 2),
+            ('2024-05', 'income', 'Salary', 50000, 1),
+            ('2024-06', 'expense', 'Food', 20, 1),
+        ])
+        self.assertEqual(self.db.check_monthly_rollup(), [])
+
+        self.db.delete_expense(first)
+        self.assertEqual(self.rollup()[0], ('2024-05', 'expense', 'Food', 10, 1))
+        # A group whose last row goes is removed, not left at zero
+        for row in self.db.get_expenses(start_date='2024-06-01'):
+            self.db.delete_expense(row.id)
+        self.assertEqual([row[:3] for row in self.rollup()],
+                         [('2024-05', 'expense', 'Food'), ('2024-05', 'income', 'Salary')])
+        self.assertEqual(self.db.check_monthly_rollup(), [])
+
+    def test_update_trigger_moves_the_row(self):
+        expense_id = self.db.add_expense(expense(40.0, '2024-05-10'))
+        with self.db.session(immediate=True) as conn:
+            conn.execute("UPDATE expenses SET date = '2024-07-02', category = 'Rent', "
+                         "amount = 4500 WHERE id = ?", (expense_id,))
+        self.assertEqual(self.rollup(), [('2024-07', 'expense', 'Rent', 4500, 1)])
+        self.assertEqual(self.db.check_monthly_rollup(), [])
+
+    def test_bulk_insert_across_chunks(self):
+        self.db.add_expense(expense(1.0, '2024-01-05'))
+        rows = [expense(0.01 * n, f'2024-0{n % 3 + 1}-1{n % 10}', ('Food', 'Fuel')[n % 2])
+                for n in range(1, 101)]
+        self.assertEqual(self.db.add_expenses_bulk(rows, chunk_size=7), 100)
+        self.assertEqual(self.db.check_monthly_rollup(), [])
+        # The per-row trigger is back once the bulk insert is done
+        self.db.add_expense(expense(2.0, '2024-01-06'))
+        self.assertEqual(self.db.check_monthly_rollup(), [])
+        self.assertEqual(self.db.get_monthly_summary(2024, 1)['total_expense'],
+                         self.db.get_totals('2024-01-01', '2024-01-31')['total_expense'])
+
+    def test_check_reports_and_rebuild_repairs_drift(self):
+        self.db.add_expense(expense(10.0, '2024-05-01'))
+        self.db.add_expense(expense(20.0, '2024-06-01'))
+        with self.db.session(immediate=True) as conn:
+            conn.execute("UPDATE monthly_rollup SET total = total + 1 "
+                         "WHERE year_month = '2024-05'")
+            conn.execute("DELETE FROM monthly_rollup WHERE year_month = '2024-06'")
+            conn.execute("INSERT INTO monthly_rollup VALUES ('2023-01', 'expense', 'Old', 5, 1)")
+
+        problems = {problem['year_month']: problem for problem in self.db.check_monthly_rollup()}
+        self.assertEqual(set(problems), {'2023-01', '2024-05', '2024-06'})
+        self.assertEqual(problems['2024-05']['expected_total'], 10.0)
+        self.assertEqual(problems['2024-05']['rollup_total'], 10.01)
+        self.assertIsNone(problems['2024-06']['rollup_count'])
+        self.assertIsNone(problems['2023-01']['expected_count'])
+
+        # A summary cached from the drifted rollup must not survive the rebuild
+        self.assertEqual(self.db.get_monthly_summary(2024, 5)['total_expense'], 10.01)
+        self.db.rebuild_monthly_rollup()
+        self.assertEqual(self.db.check_monthly_rollup(), [])
+        self.assertEqual(self.db.get_monthly_summary(2024, 5)['total_expense'], 10.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+# tests/test_search.py
+"""Database.search over FTS5 and over the LIKE fallback used when the
+SQLite build has no FTS5.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from udhar.database import Database
+from udhar.models import Expense, TransactionType, Udhar, UdharStatus
+
+
+class SearchTest(unittest.TestCase):
+    fts = True
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.directory.name, 'search.db'))
+        if self.fts and not self.db.has_search_index():
+            self.skipTest("SQLite built without FTS5")
+        # Forces the LIKE path on an FTS5 build too
+        self.db._search_index = self.fts
+        for n, (category, description) in enumerate([
+                ('Food', 'Masala chai at the station'),
+                ('Food', 'Dinner with Ravi'),
+                ('Travel', 'Auto to station'),
+                ('Rent', 'March rent')], start=1):
+            self.db.add_expense(Expense(None, 10.0 * n, category, description,
+                                        f'2024-03-0{n}', TransactionType.EXPENSE))
+        self.ravi = self.db.add_udhar(Udhar(None, 'Ravi Kumar', 500.0, 'Bike repair',
+                                            '2024-03-01', None, UdharStatus.PENDING, 0.0))
+
+    def tearDown(self):
+        self.db.close()
+        self.directory.cleanup()
+
+    def descriptions(self, results):
+        return sorted(row.description for _, row in results)
+
+    def test_all_words_must_match(self):
+        results, cursor = self.db.search('chai station')
+        self.assertIsNone(cursor)
+        self.assertEqual(self.descriptions(results), ['Masala chai at the station'])
+
+    def test_both_tables_and_scope(self):
+        results, _ = self.db.search('ravi')
+        self.assertEqual(sorted(table for table, _ in results), ['expenses', 'udhar'])
+        results, _ = self.db.search('ravi', scope='udhar')
+        self.assertEqual([(table, row.id) for table, row in results], [('udhar', self.ravi)])
+
+    def test_category_and_prefix(self):
+        results, _ = self.db.search('trav')
+        self.assertEqual(self.descriptions(results), ['Auto to station'])
+
+    def test_paging(self):
+        seen = []
+        cursor = None
+        while True:
+            page, cursor = self.db.search('station', limit=1, cursor=cursor)
+            seen.extend(page)
+            if cursor is None:
+                break
+        self.assertEqual(self.descriptions(seen), ['Auto to station',
+                                                   'Masala chai at the station'])
+
+    def test_no_words(self):
+        self.assertEqual(self.db.search('  -- '), ([], None))
+
+    def test_index_follows_writes(self):
+        expense_id = self.db.add_expense(Expense(None, 5.0, 'Food', 'Samosa', '2024-03-09',
+                                                 TransactionType.EXPENSE))
+        self.assertEqual(len(self.db.search('samosa')[0]), 1)
+        self.db.delete_expense(expense_id)
+        self.assertEqual(self.db.search('samosa'), ([], None))
+
+
+class LikeSearchTest(SearchTest):
+    fts = False
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,8 @@
+# udhar/__init__.py
+"""Storage layer for the Udhar/Expense app: SQLite database, models and
+import/export. Pure Python with no Kivy dependency, so it runs headless;
+see `python -m udhar --help`."""
+from .database import Database, ChangeEvent, StorageProfile, default_data_dir
+from .models import (Expense, Udhar, TransactionType, UdharStatus, Money,
+                     ExpenseRecord, UdharRecord, PaymentRecord, HistoryEntry,
+                     BudgetStatus)
@@ -0,0 +1,236 @@
+# udhar/__main__.py
+"""Headless command line for the ledger; needs no display or Kivy.
+
+    python -m udhar add expense 250 Food --note "lunch"
+    python -m udhar add udhar Ramesh 500 --due 2026-12-01
+    python -m udhar list expenses --start 2026-10-01
+    python -m udhar report 2026-10
+    python -m udhar budget set Food 8000
+    python -m udhar export exports/ --format jsonl
+    python -m udhar import history.csv --kind udhar
+    python -m udhar maintain check-rollup
+"""
+import argparse
+import os
+import sys
+from datetime import date, datetime
+
+from .database import Database
+from .exporter import FORMATS, TABLES, export_ledger, export_table
+from .importer import PARSERS, import_file, parse_expense, parse_udhar
+from .models import Money
+
+def _month(value: str) -> str:
+    """argparse type for YYYY-MM, normalized so months compare as text"""
+    try:
+        return datetime.strptime(value, '%Y-%m').strftime('%Y-%m')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid month {value!r} (expected YYYY-MM)")
+
+def _date(value: str) -> str:
+    """argparse type for YYYY-MM-DD"""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r} (expected YYYY-MM-DD)")
+
+def _money(rupees) -> str:
+    return str(Money.of(rupees))
+
+def _warn_over_budget(event):
+    if event.action == 'over_budget':
+        status = event.row
+        print(f"warning: {status.category} is over budget for {status.month}: "
+              f"{_money(status.spent)} of {_money(status.limit)}")
+
+def cmd_add(db, args):
+    today = date.today().isoformat()
+    db.add_listener(_warn_over_budget)
+    # Same validation as the importer applies to each record
+    if args.kind == 'expense':
+        record = parse_expense({
+            'amount': args.amount, 'category': args.category,
+            'description': args.note, 'date': args.date or today,
+            'transaction_type': 'income' if args.income else 'expense',
+        })
+        new_id = db.add_expense(record)
+    else:
+        record = parse_udhar({
+            'person_name': args.person, 'amount': args.amount,
+            'description': args.note, 'date_given': args.date or today,
+            'due_date': args.due,
+        })
+        new_id = db.add_udhar(record)
+    print(f"added {args.kind} #{new_id}")
+
+def cmd_list(db, args):
+    if args.kind == 'expenses':
+        rows, _ = db.get_expenses_page(limit=args.limit, start_date=args.start,
+                                       end_date=args.end, category=args.category)
+        for row in rows:
+            sign = '+' if row.transaction_type == 'income' else '-'
+            print(f"#{row.id}\t{row.date}\t{sign}{_money(row.amount)}\t"
+                  f"{row.category}\t{row.description or ''}")
+    else:
+        rows = db.get_udhar_list(args.status)[:args.limit]
+        for row in rows:
+            print(f"#{row.id}\t{row.date_given}\t{row.person_name}\t{_money(row.amount)}\t"
+                  f"paid {_money(row.amount_paid)}\t{row.status}\t{row.due_date or ''}\t"
+                  f"{row.description or ''}")
+
+def cmd_report(db, args):
+    month = args.month or date.today().strftime('%Y-%m')
+    if args.to:
+        start, end = sorted([month, args.to])
+        summary = db.get_range_summary(start, end, args.granularity)
+        for point in summary['series']:
+            print(f"{point['period']}\t+{_money(point['income'])}\t"
+                  f"-{_money(point['expense'])}\tnet {_money(point['net'])}")
+    else:
+        year, number = map(int, month.split('-'))
+        summary = db.get_monthly_summary(year, number)
+        for category, amount in summary['category_breakdown']:
+            print(f"{category}\t{_money(amount)}")
+        print(f"Pending udhar: {_money(summary['pending_udhar'])}")
+    print(f"Income: {_money(summary['total_income'])}  "
+          f"Expense: {_money(summary['total_expense'])}  "
+          f"Net: {_money(summary['net_savings'])}")
+
+def cmd_budget(db, args):
+    if args.action == 'set':
+        amount = float(args.amount)
+        db.set_budget(args.category, amount)
+        print(f"{args.category}: {_money(amount)} a month")
+    elif args.action == 'remove':
+        if not db.remove_budget(args.category):
+            print(f"{args.category} has no budget")
+            return 1
+        print(f"{args.category}: budget removed")
+    else:
+        month = args.month or date.today().strftime('%Y-%m')
+        year, number = map(int, month.split('-'))
+        for status in db.get_budget_status(year, number):
+            flag = "  OVER" if status.over else ""
+            print(f"{status.category}\t{_money(status.spent)} of {_money(status.limit)}\t"
+                  f"{status.fraction:.0%}{flag}")
+
+def cmd_export(db, args):
+    if args.table:
+        os.makedirs(args.out, exist_ok=True)
+        path = os.path.join(args.out, args.table + FORMATS[args.format])
+        results = {args.table: (path, export_table(
+            db, args.table, path, args.format, args.start, args.end, args.category))}
+    else:
+        results = export_ledger(db, args.out, args.format,
+                                args.start, args.end, args.category)
+    for table, (path, count) in results.items():
+        print(f"{table}: {count} rows -> {path}")
+
+def cmd_import(db, args):
+    report = import_file(db, args.path, args.kind)
+    for line, reason in report.errors:
+        print(f"line {line}: {reason}")
+    print(f"{report.imported} imported, {report.error_count} rejected")
+
+def cmd_maintain(db, args):
+    if args.task == 'rebuild-rollup':
+        db.rebuild_monthly_rollup()
+        print("monthly_rollup rebuilt")
+    elif args.task == 'reconcile-payments':
+        drift = db.reconcile_udhar_payments(fix=not args.dry_run)
+        for row in drift:
+            print(row)
+        print(f"{len(drift)} udhar record(s) drifted from the payment ledger"
+              + ("" if args.dry_run else " (fixed)"))
+    else:
+        problems = db.check_monthly_rollup()
+        for problem in problems:
+            print(problem)
+        print(f"{len(problems)} mismatching group(s)")
+        return 1 if problems else 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m udhar',
+                                     description="Udhar/Expense ledger")
+    parser.add_argument('--db', help="Path to udhar_expense.db "
+                                     "(default: $UDHAR_DATA_DIR or the project directory)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="Add an expense or udhar record")
+    kinds = add.add_subparsers(dest='kind', required=True)
+    expense = kinds.add_parser('expense')
+    expense.add_argument('amount')
+    expense.add_argument('category')
+    expense.add_argument('--income', action='store_true', help="Record income instead")
+    expense.add_argument('--date', help="YYYY-MM-DD (default: today)")
+    expense.add_argument('--note', default='')
+    udhar = kinds.add_parser('udhar')
+    udhar.add_argument('person')
+    udhar.add_argument('amount')
+    udhar.add_argument('--date', help="Date given, YYYY-MM-DD (default: today)")
+    udhar.add_argument('--due', help="Due date, YYYY-MM-DD")
+    udhar.add_argument('--note', default='')
+    add.set_defaults(handler=cmd_add)
+
+    listing = commands.add_parser('list', help="List expenses or udhar records")
+    listing.add_argument('kind', choices=['expenses', 'udhar'])
+    listing.add_argument('--limit', type=int, default=50)
+    listing.add_argument('--start', type=_date, help="expenses: from date (YYYY-MM-DD)")
+    listing.add_argument('--end', type=_date, help="expenses: to date (YYYY-MM-DD), inclusive")
+    listing.add_argument('--category', help="expenses: category filter")
+    listing.add_argument('--status', choices=['pending', 'partial', 'cleared'],
+                         help="udhar: status filter")
+    listing.set_defaults(handler=cmd_list)
+
+    report = commands.add_parser('report', help="Monthly or range summary")
+    report.add_argument('month', nargs='?', type=_month, help="YYYY-MM (default: this month)")
+    report.add_argument('--to', type=_month, help="End month (YYYY-MM) for a range report")
+    report.add_argument('--granularity', choices=['month', 'week', 'day'], default='month')
+    report.set_defaults(handler=cmd_report)
+
+    budget = commands.add_parser('budget', help="Monthly category budgets")
+    actions = budget.add_subparsers(dest='action')
+    setting = actions.add_parser('set', help="Set a category's monthly limit")
+    setting.add_argument('category')
+    setting.add_argument('amount')
+    removing = actions.add_parser('remove', help="Remove a category's budget")
+    removing.add_argument('category')
+    showing = actions.add_parser('show', help="Spend against each budget (the default)")
+    showing.add_argument('month', nargs='?', type=_month, help="YYYY-MM (default: this month)")
+    budget.set_defaults(handler=cmd_budget, month=None)
+
+    export = commands.add_parser('export', help="Export the ledger")
+    export.add_argument('out', help="Output directory")
+    export.add_argument('--format', choices=sorted(FORMATS), default='csv')
+    export.add_argument('--table', choices=TABLES, help="Only export this table")
+    export.add_argument('--start', type=_date, help="From date (YYYY-MM-DD)")
+    export.add_argument('--end', type=_date, help="To date (YYYY-MM-DD), inclusive")
+    export.add_argument('--category', help="Expense category filter")
+    export.set_defaults(handler=cmd_export)
+
+    importing = commands.add_parser('import', help="Import expenses or udhar from CSV/JSON")
+    importing.add_argument('path', help=".csv, .jsonl or .json file")
+    importing.add_argument('--kind', choices=sorted(PARSERS), default='expenses')
+    importing.set_defaults(handler=cmd_import)
+
+    maintain = commands.add_parser('maintain', help="Database maintenance")
+    maintain.add_argument('task', choices=['rebuild-rollup', 'check-rollup',
+                                           'reconcile-payments'])
+    maintain.add_argument('--dry-run', action='store_true',
+                          help="reconcile-payments: report drift without fixing it")
+    maintain.set_defaults(handler=cmd_maintain)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    db = Database(args.db)
+    try:
+        return args.handler(db, args)
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,329 @@
+# udhar/analytics.py
+"""Columnar in-memory snapshot of the expenses table for heavier reports.
+
+ExpenseColumns loads expenses once into compact array-backed columns
+(about 27 bytes a row): dates as day ordinals and month numbers, amounts
+in paise and categories dictionary-encoded to small ints. Pivots,
+percentiles, weekday and rolling sums and top-N queries are answered
+from them without going back to SQLite. refresh() only reads rows added
+since the last one (by id), falling back to a full reload if any were
+deleted.
+
+With NumPy installed the queries run vectorised over zero-copy views of
+the arrays; without it (the Android build does not ship it) plain loops
+over the same arrays give the same results.
+"""
+import heapq
+import logging
+from array import array
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+FETCH_CHUNK = 10000
+
+def _month_label(month: int) -> str:
+    return f"{month // 12}-{month % 12 + 1:02d}"
+
+def _ordinal(day: Optional[str]) -> Optional[int]:
+    return date.fromisoformat(day).toordinal() if day else None
+
+def _percentile(ordered: Sequence[int], q: float) -> float:
+    """Linear interpolation between closest ranks, as numpy.percentile"""
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+class ExpenseColumns:
+    """Array-backed copy of the expenses table; see the module docstring.
+
+    Filters shared by the queries: start_date/end_date ('YYYY-MM-DD',
+    inclusive), kind ('expense', 'income' or None for both) and category.
+    Amounts come back in rupees. Not thread-safe: refresh and query from
+    one thread (the app's DB worker).
+    """
+
+    def __init__(self, db, use_numpy: Optional[bool] = None):
+        self.db = db
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        if self.use_numpy and np is None:
+            raise RuntimeError("NumPy is not installed")
+        self._reset()
+
+    def _reset(self):
+        self.ids = array('q')
+        self.days = array('i')        # date.toordinal()
+        self.months = array('i')      # year * 12 + month - 1
+        self.amounts = array('q')     # paise
+        self.categories = array('H')  # index into category_names
+        self.income = array('b')      # 1 for income, 0 for expense
+        self.category_names = []
+        self._category_codes = {}
+        self._dates = {}  # 'YYYY-MM-DD' -> (ordinal, month)
+        self.last_id = 0
+        self.skipped = 0  # rows at or below last_id dropped for a bad date
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in
+                   (self.ids, self.days, self.months, self.amounts,
+                    self.categories, self.income))
+
+    # Loading
+    def refresh(self) -> int:
+        """Load rows added since the last refresh; returns how many.
+
+        A full reload happens on first use and whenever rows at or below
+        the last seen id have been deleted (rows skipped for a bad date
+        still count as seen).
+        """
+        with self.db.session() as conn:
+            if self.last_id:
+                kept = conn.execute("SELECT COUNT(*) FROM expenses WHERE id <= ?",
+                                    (self.last_id,)).fetchone()[0]
+                if kept != len(self.ids) + self.skipped:
+                    self._reset()
+            cursor = conn.execute('''
+                SELECT id, amount, category, date, transaction_type
+                FROM expenses WHERE id > ? ORDER BY id
+            ''', (self.last_id,))
+            loaded = 0
+            while True:
+                rows = cursor.fetchmany(FETCH_CHUNK)
+                if not rows:
+                    break
+                loaded += self._append(rows)
+                self.last_id = rows[-1][0]
+        return loaded
+
+    def _append(self, rows) -> int:
+        dates = self._dates
+        codes = self._category_codes
+        appended = 0
+        for row_id, amount, category, day, transaction_type in rows:
+            parsed = dates.get(day)
+            if parsed is None:
+                try:
+                    value = date.fromisoformat(day)
+                except (TypeError, ValueError):
+                    logger.warning("Skipping expense %s with bad date %r", row_id, day)
+                    self.skipped += 1
+                    continue
+                parsed = dates[day] = (value.toordinal(), value.year * 12 + value.month - 1)
+            code = codes.get(category)
+            if code is None:
+                code = codes[category] = len(self.category_names)
+                self.category_names.append(category)
+            self.ids.append(row_id)
+            self.days.append(parsed[0])
+            self.months.append(parsed[1])
+            self.amounts.append(amount)
+            self.categories.append(code)
+            self.income.append(transaction_type == 'income')
+            appended += 1
+        return appended
+
+    # Filtering
+    def _category_code(self, category: Optional[str]) -> Optional[int]:
+        if category is None:
+            return None
+        # -1 matches nothing
+        return self._category_codes.get(category, -1)
+
+    def _mask(self, start_date, end_date, kind, category):
+        """NumPy path: boolean row mask (None means every row)"""
+        conditions = []
+        days = np.frombuffer(self.days, dtype=np.int32)
+        if start_date:
+            conditions.append(days >= _ordinal(start_date))
+        if end_date:
+            conditions.append(days <= _ordinal(end_date))
+        if kind is not None:
+            conditions.append(np.frombuffer(self.income, dtype=np.int8) == (kind == 'income'))
+        code = self._category_code(category)
+        if code is not None:
+            conditions.append(np.frombuffer(self.categories, dtype=np.uint16) == code)
+        if not conditions:
+            return None
+        mask = conditions[0]
+        for condition in conditions[1:]:
+            mask &= condition
+        return mask
+
+    def _column(self, column, dtype, mask):
+        values = np.frombuffer(column, dtype=dtype)
+        return values if mask is None else values[mask]
+
+    def _rows(self, start_date, end_date, kind, category) -> List[int]:
+        """Pure-Python path: indexes of the matching rows"""
+        start, end = _ordinal(start_date), _ordinal(end_date)
+        income = None if kind is None else int(kind == 'income')
+        code = self._category_code(category)
+        days, flags, categories = self.days, self.income, self.categories
+        return [
+            i for i in range(len(days))
+            if (start is None or days[i] >= start)
+            and (end is None or days[i] <= end)
+            and (income is None or flags[i] == income)
+            and (code is None or categories[i] == code)
+        ]
+
+    # Queries
+    def pivot(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+              kind: Optional[str] = 'expense') -> dict:
+        """Category x month totals: {'months': [...], 'categories': [...],
+        'values': [[rupees per month] per category]}, categories by total
+        descending and months without rows left out"""
+        if self.use_numpy:
+            mask = self._mask(start_date, end_date, kind, None)
+            months = self._column(self.months, np.int32, mask)
+            if not len(months):
+                return {'months': [], 'categories': [], 'values': []}
+            month_keys, month_index = np.unique(months, return_inverse=True)
+            codes = self._column(self.categories, np.uint16, mask).astype(np.int64)
+            cells = np.bincount(codes * len(month_keys) + month_index,
+                                weights=self._column(self.amounts, np.int64, mask),
+                                minlength=len(self.category_names) * len(month_keys))
+            grid = np.rint(cells).astype(np.int64).reshape(len(self.category_names),
+                                                           len(month_keys))
+            totals = grid.sum(axis=1)
+            order = [int(c) for c in np.argsort(-totals, kind='stable') if totals[c]]
+            month_keys = month_keys.tolist()
+            cells = {(c, m): int(grid[c, m]) for c in order for m in range(len(month_keys))}
+        else:
+            sums = {}
+            for i in self._rows(start_date, end_date, kind, None):
+                key = (self.categories[i], self.months[i])
+                sums[key] = sums.get(key, 0) + self.amounts[i]
+            month_keys = sorted({month for _, month in sums})
+            position = {month: m for m, month in enumerate(month_keys)}
+            totals = {}
+            for (code, _), amount in sums.items():
+                totals[code] = totals.get(code, 0) + amount
+            order = sorted((c for c in totals if totals[c]), key=lambda c: (-totals[c], c))
+            cells = {(code, position[month]): amount for (code, month), amount in sums.items()}
+        return {
+            'months': [_month_label(month) for month in month_keys],
+            'categories': [self.category_names[c] for c in order],
+            'values': [[cells.get((c, m), 0) / 100 for m in range(len(month_keys))]
+                       for c in order],
+        }
+
+    def percentiles(self, quantiles: Sequence[float] = (50, 90, 99),
+                    start_date: Optional[str] = None, end_date: Optional[str] = None,
+                    kind: Optional[str] = 'expense',
+                    category: Optional[str] = None) -> Dict[float, float]:
+        """Transaction amount at each quantile (0-100); {} without rows"""
+        if self.use_numpy:
+            amounts = self._column(self.amounts, np.int64,
+                                   self._mask(start_date, end_date, kind, category))
+            if not len(amounts):
+                return {}
+            values = np.percentile(amounts, quantiles).tolist()
+        else:
+            amounts = sorted(self.amounts[i] for i in
+                             self._rows(start_date, end_date, kind, category))
+            if not amounts:
+                return {}
+            values = [_percentile(amounts, q) for q in quantiles]
+        return {q: round(value) / 100 for q, value in zip(quantiles, values)}
+
+    def weekday_totals(self, start_date: Optional[str] = None,
+                       end_date: Optional[str] = None,
+                       kind: Optional[str] = 'expense',
+                       category: Optional[str] = None) -> List[Tuple[str, float]]:
+        """(weekday, rupees) Monday to Sunday"""
+        if self.use_numpy:
+            mask = self._mask(start_date, end_date, kind, category)
+            # Ordinal 1 (1 Jan of year 1) was a Monday
+            weekdays = (self._column(self.days, np.int32, mask) - 1) % 7
+            sums = np.rint(np.bincount(weekdays, minlength=7,
+                                       weights=self._column(self.amounts, np.int64, mask)))
+            sums = [int(s) for s in sums]
+        else:
+            sums = [0] * 7
+            for i in self._rows(start_date, end_date, kind, category):
+                sums[(self.days[i] - 1) % 7] += self.amounts[i]
+        return [(name, total / 100) for name, total in zip(WEEKDAYS, sums)]
+
+    def rolling_sum(self, window: int = 7, start_date: Optional[str] = None,
+                    end_date: Optional[str] = None, kind: Optional[str] = 'expense',
+                    category: Optional[str] = None) -> List[Tuple[str, float]]:
+        """(day, rupees over the `window` days ending that day) for every day
+        from the first to the last matching transaction"""
+        if self.use_numpy:
+            mask = self._mask(start_date, end_date, kind, category)
+            days = self._column(self.days, np.int32, mask)
+            if not len(days):
+                return []
+            first = int(days.min())
+            daily = np.rint(np.bincount(days - first,
+                                        weights=self._column(self.amounts, np.int64, mask)))
+            totals = np.cumsum(daily.astype(np.int64))
+            totals[window:] = totals[window:] - totals[:-window]
+            totals = totals.tolist()
+        else:
+            rows = self._rows(start_date, end_date, kind, category)
+            if not rows:
+                return []
+            first = min(self.days[i] for i in rows)
+            daily = [0] * (max(self.days[i] for i in rows) - first + 1)
+            for i in rows:
+                daily[self.days[i] - first] += self.amounts[i]
+            totals = []
+            running = 0
+            for offset, amount in enumerate(daily):
+                running += amount
+                if offset >= window:
+                    running -= daily[offset - window]
+                totals.append(running)
+        return [(date.fromordinal(first + offset).isoformat(), total / 100)
+                for offset, total in enumerate(totals)]
+
+    def top_categories(self, n: int = 5, start_date: Optional[str] = None,
+                       end_date: Optional[str] = None,
+                       kind: Optional[str] = 'expense') -> List[Tuple[str, float]]:
+        """The n categories with the largest totals, largest first"""
+        if self.use_numpy:
+            mask = self._mask(start_date, end_date, kind, None)
+            codes = self._column(self.categories, np.uint16, mask)
+            sums = np.rint(np.bincount(codes, minlength=len(self.category_names),
+                                       weights=self._column(self.amounts, np.int64, mask)))
+            totals = {code: int(total) for code, total in enumerate(sums) if total}
+        else:
+            totals = {}
+            for i in self._rows(start_date, end_date, kind, None):
+                code = self.categories[i]
+                totals[code] = totals.get(code, 0) + self.amounts[i]
+        top = heapq.nsmallest(n, totals.items(), key=lambda item: (-item[1], item[0]))
+        return [(self.category_names[code], total / 100) for code, total in top]
+
+    def largest(self, n: int = 10, start_date: Optional[str] = None,
+                end_date: Optional[str] = None, kind: Optional[str] = 'expense',
+                category: Optional[str] = None) -> List[Tuple[int, float]]:
+        """(expense id, rupees) of the n largest transactions, largest first"""
+        if self.use_numpy:
+            mask = self._mask(start_date, end_date, kind, category)
+            amounts = self._column(self.amounts, np.int64, mask)
+            ids = self._column(self.ids, np.int64, mask)
+            if len(amounts) > n:
+                # Everything tied with the n-th largest, so ties break by id
+                # exactly as below
+                keep = amounts >= np.partition(amounts, len(amounts) - n)[len(amounts) - n]
+                amounts, ids = amounts[keep], ids[keep]
+            pairs = zip(ids.tolist(), amounts.tolist())
+        else:
+            pairs = ((self.ids[i], self.amounts[i]) for i in
+                     self._rows(start_date, end_date, kind, category))
+        top = heapq.nsmallest(n, pairs, key=lambda pair: (-pair[1], pair[0]))
+        return [(row_id, amount / 100) for row_id, amount in top]
@@ -0,0 +1,95 @@
+# udhar/cache.py
+"""Read-through cache for Database query results.
+
+Entries are keyed by method name and arguments, and record what they read
+as (table, first_month, last_month) spans, months as 'YYYY-MM' and None
+for an open end. A committed write invalidates only the entries whose
+spans cover its table and month: adding a June expense drops June's
+summary and the category list, but May's summary and the udhar list stay
+cached.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 256
+
+Span = Tuple[str, Optional[str], Optional[str]]
+
+def _covers(span: Span, table: str, month: Optional[str]) -> bool:
+    span_table, first, last = span
+    if span_table != table:
+        return False
+    if month is None:
+        return True
+    return (first is None or first <= month) and (last is None or month <= last)
+
+class QueryCache:
+    """LRU map of query results with table/month invalidation.
+
+    Values are shared between callers, so they must be treated as
+    read-only. Thread-safe.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (spans, value)
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a result computed while a write
+        # committed is not stored (see put)
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """(True, value) on a hit, (False, None) on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, key: Hashable, spans: Iterable[Span], value: Any, version: int):
+        """Store value unless anything was invalidated since `version`
+        (self.version when the query started) was read"""
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = (tuple(spans), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, table: str, month: Optional[str] = None):
+        """Drop entries that read `table` in `month` (any month if None)"""
+        with self._lock:
+            self.version += 1
+            stale = [key for key, (spans, _) in self._entries.items()
+                     if any(_covers(span, table, month) for span in spans)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
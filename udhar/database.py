@@ -0,0 +1,1429 @@
+# udhar/database.py
+import functools
+import heapq
+import logging
+import re
+import sqlite3
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import islice
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .models import (Expense, Udhar, TransactionType, UdharStatus, Money,
+                     ExpenseRecord, UdharRecord, PaymentRecord, HistoryEntry,
+                     BudgetStatus)
+from .cache import DEFAULT_MAX_ENTRIES, QueryCache
+import os
+
+logger = logging.getLogger(__name__)
+
+DB_FILENAME = "udhar_expense.db"
+DATA_DIR_ENV = "UDHAR_DATA_DIR"
+
+def default_data_dir() -> str:
+    """Where udhar_expense.db lives when no path or resolver is given:
+    $UDHAR_DATA_DIR, else the project directory (next to main.py)"""
+    return os.environ.get(DATA_DIR_ENV) or os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__)))
+
+# Per-row rollup maintenance for inserts. Bulk inserts drop it for the
+# duration of their transaction and fold each chunk in with one query.
+_ROLLUP_INSERT_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS trg_expenses_rollup_insert
+    AFTER INSERT ON expenses
+    BEGIN
+        INSERT INTO monthly_rollup (year_month, transaction_type, category, total, count)
+        VALUES (substr(NEW.date, 1, 7), NEW.transaction_type, NEW.category, NEW.amount, 1)
+        ON CONFLICT (year_month, transaction_type, category)
+        DO UPDATE SET total = total + excluded.total, count = count + 1;
+    END
+'''
+
+# Schema migrations, applied in order by init_database(). The list position
+# (1-based) is the schema version stored in PRAGMA user_version. Each entry
+# is a list of SQL statements or callables taking the connection. Only ever
+# append: a migration that has shipped must not change.
+MIGRATIONS = [
+    # 1: base tables
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS expenses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            amount REAL NOT NULL,
+            category TEXT NOT NULL,
+            description TEXT,
+            date TEXT NOT NULL,
+            transaction_type TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS udhar (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            person_name TEXT NOT NULL,
+            amount REAL NOT NULL,
+            description TEXT,
+            date_given TEXT NOT NULL,
+            due_date TEXT,
+            status TEXT DEFAULT 'pending',
+            amount_paid REAL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS udhar_payments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            udhar_id INTEGER,
+            amount REAL NOT NULL,
+            payment_date TEXT NOT NULL,
+            FOREIGN KEY (udhar_id) REFERENCES udhar(id)
+        )
+        ''',
+    ],
+    # 2: secondary indexes for the list, filter and summary queries
+    [
+        # Covers the per-type SUM(amount) date-range scans in get_monthly_summary
+        "CREATE INDEX IF NOT EXISTS idx_expenses_type_date_amount "
+        "ON expenses(transaction_type, date, amount)",
+        # get_expenses: date range + ORDER BY date DESC, id DESC
+        "CREATE INDEX IF NOT EXISTS idx_expenses_date_id ON expenses(date, id)",
+        # get_expenses filtered by category
+        "CREATE INDEX IF NOT EXISTS idx_expenses_category_date "
+        "ON expenses(category, date)",
+        # get_udhar_list with and without a status filter
+        "CREATE INDEX IF NOT EXISTS idx_udhar_status_date "
+        "ON udhar(status, date_given)",
+        "CREATE INDEX IF NOT EXISTS idx_udhar_date ON udhar(date_given)",
+        # Payment lookups and deletes by loan
+        "CREATE INDEX IF NOT EXISTS idx_udhar_payments_udhar "
+        "ON udhar_payments(udhar_id)",
+    ],
+    # 3: monthly_rollup, kept in step with expenses by triggers
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS monthly_rollup (
+            year_month TEXT NOT NULL,
+            transaction_type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            total REAL NOT NULL DEFAULT 0,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (year_month, transaction_type, category)
+        ) WITHOUT ROWID
+        ''',
+        _ROLLUP_INSERT_TRIGGER,
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_rollup_delete
+        AFTER DELETE ON expenses
+        BEGIN
+            UPDATE monthly_rollup
+            SET total = total - OLD.amount, count = count - 1
+            WHERE year_month = substr(OLD.date, 1, 7)
+              AND transaction_type = OLD.transaction_type
+              AND category = OLD.category;
+            DELETE FROM monthly_rollup WHERE count <= 0;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_rollup_update
+        AFTER UPDATE OF amount, category, date, transaction_type ON expenses
+        BEGIN
+            UPDATE monthly_rollup
+            SET total = total - OLD.amount, count = count - 1
+            WHERE year_month = substr(OLD.date, 1, 7)
+              AND transaction_type = OLD.transaction_type
+              AND category = OLD.category;
+            DELETE FROM monthly_rollup WHERE count <= 0;
+            INSERT INTO monthly_rollup (year_month, transaction_type, category, total, count)
+            VALUES (substr(NEW.date, 1, 7), NEW.transaction_type, NEW.category, NEW.amount, 1)
+            ON CONFLICT (year_month, transaction_type, category)
+            DO UPDATE SET total = total + excluded.total, count = count + 1;
+        END
+        ''',
+        # Backfill from existing rows
+        '''
+        INSERT INTO monthly_rollup (year_month, transaction_type, category, total, count)
+        SELECT substr(date, 1, 7), transaction_type, category, SUM(amount), COUNT(*)
+        FROM expenses
+        GROUP BY 1, 2, 3
+        ''',
+    ],
+    # 4: per-person lookups on the normalized name (see PERSON_KEY)
+    [
+        "CREATE INDEX IF NOT EXISTS idx_udhar_person_key "
+        "ON udhar(lower(trim(person_name)), date_given)",
+    ],
+    # 5: full-text search (skipped when SQLite lacks FTS5)
+    [
+        lambda conn: _create_search_index(conn),
+    ],
+    # 6: money columns become INTEGER paise (see MONEY_COLUMNS)
+    [
+        lambda conn: _migrate_to_paise(conn),
+    ],
+    # 7: monthly spending limits per expense category, in paise
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS budgets (
+            category TEXT PRIMARY KEY,
+            monthly_limit INTEGER NOT NULL CHECK (monthly_limit > 0)
+        ) WITHOUT ROWID
+        ''',
+    ],
+]
+
+# FTS5 tables mirroring text columns of their content table; the
+# triggers below keep them in sync on every write path
+SEARCH_INDEXES = {
+    'expenses': ('expenses_fts', ('description', 'category')),
+    'udhar': ('udhar_fts', ('person_name', 'description')),
+}
+
+def _create_search_index(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+    except sqlite3.OperationalError:
+        # No FTS5 in this SQLite build; Database.search falls back to LIKE
+        return
+    
+    for table, (fts, columns) in SEARCH_INDEXES.items():
+        cols = ", ".join(columns)
+        new = ", ".join(f"NEW.{c}" for c in columns)
+        old = ", ".join(f"OLD.{c}" for c in columns)
+        conn.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts}
+            USING fts5({cols}, content='{table}', content_rowid='id')
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.id, {new});
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.id, {old});
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {cols} ON {table}
+            BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.id, {old});
+                INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.id, {new});
+            END
+        ''')
+        conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, the last
+    one as a prefix so results follow the user while they type"""
+    words = re.findall(r"\w+", text)
+    if not words:
+        return ""
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+# Row type per table; the field order is the table's column order
+ROW_TYPES = {
+    'expenses': ExpenseRecord,
+    'udhar': UdharRecord,
+    'udhar_payments': PaymentRecord,
+}
+TABLE_COLUMNS = {table: row_type._fields for table, row_type in ROW_TYPES.items()}
+# Money is stored as INTEGER paise so SUMs and status comparisons are exact.
+# Rows leave the Database in rupees through SELECT_COLUMNS.
+MONEY_COLUMNS = {
+    'expenses': ('amount',),
+    'udhar': ('amount', 'amount_paid'),
+    'udhar_payments': ('amount',),
+}
+
+def _select_columns(table: str, alias: str = '',
+                    columns: Optional[Sequence[str]] = None) -> str:
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(
+        f"{prefix}{name} / 100.0 AS {name}" if name in MONEY_COLUMNS[table] else prefix + name
+        for name in columns or TABLE_COLUMNS[table])
+
+SELECT_COLUMNS = {table: _select_columns(table) for table in TABLE_COLUMNS}
+
+@functools.lru_cache(maxsize=None)
+def _row_type(table: str, columns: Optional[Tuple[str, ...]] = None) -> type:
+    """The table's row type, or a namedtuple of just `columns` for
+    queries that only need some of them"""
+    if columns is None or columns == TABLE_COLUMNS[table]:
+        return ROW_TYPES[table]
+    unknown = set(columns) - set(TABLE_COLUMNS[table])
+    if unknown:
+        raise ValueError(f"Unknown {table} columns: {', '.join(sorted(unknown))}")
+    return namedtuple(ROW_TYPES[table].__name__, columns)
+
+def _fetch(conn, row_type: type, query: str, params=()) -> sqlite3.Cursor:
+    """Execute query with rows built directly as row_type"""
+    new = tuple.__new__
+    cursor = conn.cursor()
+    # Skips the namedtuple __new__ argument handling; the SELECT's column
+    # list already matches row_type's fields
+    cursor.row_factory = lambda _, row: new(row_type, row)
+    return cursor.execute(query, params)
+
+def _rupees(paise) -> float:
+    return Money(paise or 0).rupees
+
+_PAISE_TABLES = {
+    'expenses': '''
+        CREATE TABLE expenses_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            amount INTEGER NOT NULL,
+            category TEXT NOT NULL,
+            description TEXT,
+            date TEXT NOT NULL,
+            transaction_type TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+    'udhar': '''
+        CREATE TABLE udhar_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            person_name TEXT NOT NULL,
+            amount INTEGER NOT NULL,
+            description TEXT,
+            date_given TEXT NOT NULL,
+            due_date TEXT,
+            status TEXT DEFAULT 'pending',
+            amount_paid INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+    'udhar_payments': '''
+        CREATE TABLE udhar_payments_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            udhar_id INTEGER,
+            amount INTEGER NOT NULL,
+            payment_date TEXT NOT NULL,
+            FOREIGN KEY (udhar_id) REFERENCES udhar(id)
+        )
+    ''',
+}
+
+def _migrate_to_paise(conn):
+    """SQLite cannot change a column's type in place, so each table is
+    rebuilt and copied across. Dropping the old tables also drops their
+    indexes and triggers, which are then recreated."""
+    for table, create in _PAISE_TABLES.items():
+        columns = TABLE_COLUMNS[table]
+        values = ", ".join(
+            f"CAST(round({name} * 100) AS INTEGER)" if name in MONEY_COLUMNS[table] else name
+            for name in columns)
+        conn.execute(create)
+        conn.execute(f"INSERT INTO {table}_new ({', '.join(columns)}) "
+                     f"SELECT {values} FROM {table}")
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    
+    conn.execute("DROP TABLE monthly_rollup")
+    conn.execute('''
+        CREATE TABLE monthly_rollup (
+            year_month TEXT NOT NULL,
+            transaction_type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (year_month, transaction_type, category)
+        ) WITHOUT ROWID
+    ''')
+    # Indexes (2, 4) and the rollup triggers and backfill (3)
+    for statement in MIGRATIONS[1] + MIGRATIONS[2][1:] + MIGRATIONS[3]:
+        conn.execute(statement)
+    _create_search_index(conn)
+
+# Names are matched case- and whitespace-insensitively. Queries must use
+# this exact expression for idx_udhar_person_key to apply.
+PERSON_KEY = "lower(trim(person_name))"
+
+# Streamable tables -> (date column, category column) used by iter_rows filters
+STREAM_FILTERS = {
+    'expenses': ('date', 'category'),
+    'udhar': ('date_given', None),
+    'udhar_payments': ('payment_date', None),
+}
+
+# Rows per transaction for the bulk insert APIs
+BULK_CHUNK_SIZE = 50000
+
+# strftime() bucket formats for get_range_summary
+RANGE_FORMATS = {
+    'month': '%Y-%m',
+    'week': '%Y-W%W',
+    'day': '%Y-%m-%d',
+}
+
+def _next_month_start(year_month: str) -> str:
+    year, month = map(int, year_month.split('-'))
+    if month == 12:
+        return f"{year+1}-01-01"
+    return f"{year}-{month+1:02d}-01"
+
+def _merge_week(period: str, start_date: str) -> str:
+    """%W numbers the days before a year's first Monday as week 00, which
+    splits the week spanning New Year in two. Label them with the previous
+    year's last week instead, when the range reaches back that far."""
+    if not period.endswith('-W00'):
+        return period
+    new_years_eve = f"{int(period[:4]) - 1}-12-31"
+    if new_years_eve < start_date:
+        return period
+    return datetime.strptime(new_years_eve, "%Y-%m-%d").strftime(RANGE_FORMATS['week'])
+
+def _range_periods(start_date: str, end_date: str, granularity: str) -> List[str]:
+    """Every bucket label between start_date (inclusive) and end_date (exclusive)"""
+    fmt = RANGE_FORMATS[granularity]
+    day = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    periods = []
+    while day < end:
+        period = day.strftime(fmt)
+        if granularity == 'week':
+            period = _merge_week(period, start_date)
+        if not periods or periods[-1] != period:
+            periods.append(period)
+        day += timedelta(days=1)
+    return periods
+
+def _status_case(paid: str) -> str:
+    """SQL CASE giving an udhar row's status when `paid` has been repaid"""
+    return f"""CASE
+                WHEN {paid} >= amount THEN 'cleared'
+                WHEN {paid} > 0 THEN 'partial'
+                ELSE 'pending'
+            END"""
+
+def _month(date: Optional[str]) -> Optional[str]:
+    return date[:7] if date else None
+
+def _cached(spans: Callable):
+    """Serve a read method from Database.cache. spans takes the method's
+    arguments and returns the (table, first_month, last_month) spans it
+    reads, which decide the writes that invalidate it (see udhar/cache.py)."""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self.cache
+            # Inside a session the result may include uncommitted writes,
+            # which must neither be cached nor be answered from the cache
+            if cache is None or getattr(self._local, 'depth', 0):
+                return method(self, *args, **kwargs)
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                # e.g. columns passed as a list
+                return method(self, *args, **kwargs)
+            found, value = cache.get(key)
+            if found:
+                return value
+            version = cache.version
+            value = method(self, *args, **kwargs)
+            cache.put(key, spans(*args, **kwargs), value, version)
+            return value
+        return wrapper
+    return decorate
+
+# Raw per-month aggregates that monthly_rollup must always equal
+_ROLLUP_SOURCE = '''
+    SELECT substr(date, 1, 7) AS year_month, transaction_type, category,
+           SUM(amount) AS total, COUNT(*) AS count
+    FROM expenses
+    GROUP BY 1, 2, 3
+'''
+
+@dataclass
+class ChangeEvent:
+    """A committed row change: action is 'insert', 'update' or 'delete'.
+    
+    row is the full table row (an ExpenseRecord or UdharRecord, as
+    get_expenses/get_udhar_list return it) after an insert/update, or as
+    it was before a delete. Bulk writes emit a 'reload' event with
+    row None per committed chunk instead of one per row.
+    
+    Budget changes come as table 'budgets' with row a BudgetStatus. An
+    expense that takes its category's month from within budget to over it
+    is followed by an 'over_budget' event for that category; later
+    expenses while it stays over don't repeat it.
+    """
+    action: str
+    table: str
+    row: Optional[Tuple]
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """PRAGMAs applied to every connection the Database opens.
+    
+    The default trades a little durability for write speed: in WAL mode
+    with synchronous=NORMAL a commit is not fsynced until the next
+    checkpoint, so a power cut can lose the last few commits (never
+    corrupt the file). Database.checkpoint() makes everything durable.
+    """
+    journal_mode: str = 'WAL'
+    synchronous: str = 'NORMAL'
+    foreign_keys: bool = True
+    cache_size_kib: int = 8192
+    mmap_size: int = 64 * 1024 * 1024
+    temp_store: str = 'MEMORY'
+    
+    def pragmas(self) -> List[str]:
+        return [
+            f"PRAGMA journal_mode = {self.journal_mode}",
+            f"PRAGMA synchronous = {self.synchronous}",
+            f"PRAGMA foreign_keys = {'ON' if self.foreign_keys else 'OFF'}",
+            # Negative: a size in KiB rather than in pages
+            f"PRAGMA cache_size = -{self.cache_size_kib}",
+            f"PRAGMA mmap_size = {self.mmap_size}",
+            f"PRAGMA temp_store = {self.temp_store}",
+        ]
+
+# SQLite's own defaults, for comparison and for filesystems without
+# shared-memory support (WAL needs it)
+LEGACY_PROFILE = StorageProfile(journal_mode='DELETE', synchronous='FULL',
+                                foreign_keys=False, cache_size_kib=2000,
+                                mmap_size=0, temp_store='DEFAULT')
+PROFILES = {'default': StorageProfile(), 'legacy': LEGACY_PROFILE}
+
+class Database:
+    def __init__(self, db_path: Optional[str] = None,
+                 data_dir_resolver: Callable[[], str] = default_data_dir,
+                 profile: StorageProfile = StorageProfile(),
+                 cache_size: int = DEFAULT_MAX_ENTRIES):
+        """Open (and migrate) the database at db_path. Without a path the
+        file goes in data_dir_resolver()'s directory; the app passes one
+        returning Kivy's user_data_dir, so this module never imports Kivy.
+        
+        Summary reads are cached (up to cache_size results, 0 disables
+        it). The cache only sees writes made through this instance.
+        """
+        if db_path is None:
+            db_path = os.path.join(data_dir_resolver(), DB_FILENAME)
+        
+        self.db_path = db_path
+        self.profile = profile
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        
+        # One long-lived connection per thread, tracked so close() can
+        # shut all of them down deterministically.
+        self._local = threading.local()
+        self._pool_lock = threading.Lock()
+        self._pool = []
+        self._generation = 0
+        self._listeners = []
+        self.cache = QueryCache(cache_size) if cache_size else None
+        
+        self.init_database()
+    
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: transactions are driven by session()
+        conn = sqlite3.connect(self.db_path, isolation_level=None,
+                               check_same_thread=False)
+        for pragma in self.profile.pragmas():
+            conn.execute(pragma)
+        return conn
+    
+    def get_connection(self) -> sqlite3.Connection:
+        """Return the calling thread's pooled connection, opening it on first use"""
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is None or local.generation != self._generation:
+            conn = self._connect()
+            with self._pool_lock:
+                self._pool.append(conn)
+            local.conn = conn
+            local.depth = 0
+            local.events = []
+            local.generation = self._generation
+        return conn
+    
+    @contextmanager
+    def session(self, immediate: bool = False):
+        """Unit of work: everything inside runs in one transaction.
+        
+        Sessions nest; inner ones become savepoints so a failing inner
+        block only rolls back its own work. Change events queued inside
+        are delivered to listeners once the outermost session commits.
+        
+        immediate=True takes the write lock up front (BEGIN IMMEDIATE) so a
+        read-then-write cannot race another writer. Every method that
+        writes uses it: each thread has its own connection, and a deferred
+        transaction that later writes gets SQLITE_BUSY when it can't
+        upgrade its lock, instead of waiting on the busy timeout.
+        """
+        conn = self.get_connection()
+        local = self._local
+        depth = local.depth
+        queued = len(local.events)
+        if depth == 0:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        else:
+            conn.execute(f"SAVEPOINT sp_{depth}")
+        local.depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            local.depth = depth
+            del local.events[queued:]
+            if depth == 0:
+                conn.execute("ROLLBACK")
+            else:
+                conn.execute(f"ROLLBACK TO sp_{depth}")
+                conn.execute(f"RELEASE sp_{depth}")
+            raise
+        else:
+            local.depth = depth
+            if depth == 0:
+                conn.execute("COMMIT")
+                events, local.events = local.events, []
+                self._notify(events)
+            else:
+                conn.execute(f"RELEASE sp_{depth}")
+    
+    # Change events
+    def add_listener(self, callback: Callable[[ChangeEvent], None]):
+        """Call callback(event) after every committed insert/update/delete.
+        
+        Listeners run on the thread that made the change.
+        """
+        self._listeners.append(callback)
+    
+    def remove_listener(self, callback: Callable[[ChangeEvent], None]):
+        self._listeners.remove(callback)
+    
+    def _get_row(self, conn, table: str, row_id: int):
+        return _fetch(conn, ROW_TYPES[table],
+                      f"SELECT {SELECT_COLUMNS[table]} FROM {table} WHERE id = ?",
+                      (row_id,)).fetchone()
+    
+    def _emit(self, action: str, table: str, row: Optional[Tuple]):
+        # Only valid inside a session; delivered when it commits
+        self._local.events.append(ChangeEvent(action, table, row))
+    
+    def _notify(self, events: List[ChangeEvent]):
+        if self.cache is not None:
+            # Before the listeners, which typically re-query
+            for event in events:
+                self._invalidate(event)
+        for event in events:
+            for callback in list(self._listeners):
+                try:
+                    callback(event)
+                except Exception:
+                    logger.exception("Change listener failed for %s", event)
+    
+    def _invalidate(self, event: ChangeEvent):
+        if event.action == 'over_budget':
+            return  # a warning about the preceding insert, not a change
+        month = None
+        # Rows never change month in an update, but only inserts and
+        # deletes carry the one row that tells which month was touched
+        if event.action in ('insert', 'delete') and event.table in STREAM_FILTERS:
+            month = _month(getattr(event.row, STREAM_FILTERS[event.table][0]))
+        self.cache.invalidate(event.table, month)
+    
+    def cache_stats(self) -> Optional[dict]:
+        """Query cache hit/miss counters, or None when caching is off"""
+        return self.cache.stats() if self.cache is not None else None
+    
+    def checkpoint(self) -> Tuple[int, int, int]:
+        """Copy the WAL into the database file and sync it, making every
+        committed write durable; (busy, wal_pages, checkpointed_pages).
+        A no-op outside WAL mode. Call from App.on_pause/on_stop."""
+        conn = self.get_connection()
+        if self._local.depth:
+            raise RuntimeError("checkpoint() cannot run inside a session")
+        return conn.execute("PRAGMA wal_checkpoint(FULL)").fetchone()
+    
+    def close(self):
+        """Close every pooled connection (call from App.on_stop)"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, []
+            self._generation += 1
+        for conn in pool:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        if self.cache is not None:
+            self.cache.clear()
+    
+    def init_database(self):
+        """Bring the schema up to date by applying pending MIGRATIONS"""
+        conn = self.get_connection()
+        # Table rebuilds (migration 6) drop tables that udhar_payments
+        # references, so migrations run with enforcement off and the
+        # references are checked afterwards, as SQLite recommends.
+        # The PRAGMA is ignored inside a transaction, hence out here.
+        conn.execute("PRAGMA foreign_keys = OFF")
+        try:
+            with self.session(immediate=True) as conn:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                for number, steps in enumerate(MIGRATIONS[version:], start=version + 1):
+                    for step in steps:
+                        if callable(step):
+                            step(conn)
+                        else:
+                            conn.execute(step)
+                    conn.execute(f"PRAGMA user_version = {number}")
+                if version < len(MIGRATIONS):
+                    orphans = conn.execute("PRAGMA foreign_key_check").fetchall()
+                    if orphans:
+                        logger.warning("%d rows reference missing parents: %s",
+                                       len(orphans), orphans[:10])
+        finally:
+            conn.execute(f"PRAGMA foreign_keys = {'ON' if self.profile.foreign_keys else 'OFF'}")
+        # Fixed once migrations have run; search() checks it per call
+        with self.session() as conn:
+            self._search_index = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'expenses_fts'").fetchone() is not None
+    
+    def schema_version(self) -> int:
+        with self.session() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+    
+    def explain_query_plan(self, query: str, params: Tuple = ()) -> List[str]:
+        """Return SQLite's plan steps for a query, e.g. to confirm index use"""
+        with self.session() as conn:
+            rows = conn.execute("EXPLAIN QUERY PLAN " + query, params).fetchall()
+        return [row[-1] for row in rows]
+    
+    # Expense Operations
+    def add_expense(self, expense: Expense) -> int:
+        with self.session(immediate=True) as conn:
+            cursor = conn.execute('''
+                INSERT INTO expenses (amount, category, description, date, transaction_type)
+                VALUES (?, ?, ?, ?, ?)
+            ''', expense.to_tuple())
+            expense_id = cursor.lastrowid
+            self._emit('insert', 'expenses', self._get_row(conn, 'expenses', expense_id))
+            if expense.transaction_type == TransactionType.EXPENSE:
+                self._check_budget(conn, expense.category, expense.date[:7],
+                                   Money.of(expense.amount).paise)
+            return expense_id
+    
+    def _expense_filters(self, start_date: Optional[str],
+                         end_date: Optional[str],
+                         category: Optional[str]) -> Tuple[str, list]:
+        clause = ""
+        params = []
+        
+        if start_date:
+            clause += " AND date >= ?"
+            params.append(start_date)
+        if end_date:
+            clause += " AND date <= ?"
+            params.append(end_date)
+        if category:
+            clause += " AND category = ?"
+            params.append(category)
+        return clause, params
+    
+    def add_expenses_bulk(self, expenses: Iterable[Expense],
+                          chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """Insert many expenses with executemany, committing every chunk_size
+        rows. The iterable is consumed lazily. Returns the number inserted."""
+        def insert_chunk(conn, chunk):
+            # Replace the per-row rollup trigger with one grouped upsert per
+            # chunk; all inside the chunk's write transaction
+            first_id = conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM expenses").fetchone()[0] + 1
+            conn.execute("DROP TRIGGER IF EXISTS trg_expenses_rollup_insert")
+            # Date order keeps the date-leading index inserts local
+            chunk.sort(key=itemgetter(3))
+            conn.executemany('''
+                INSERT INTO expenses (amount, category, description, date, transaction_type)
+                VALUES (?, ?, ?, ?, ?)
+            ''', chunk)
+            conn.execute('''
+                INSERT INTO monthly_rollup (year_month, transaction_type, category, total, count)
+                SELECT substr(date, 1, 7), transaction_type, category, SUM(amount), COUNT(*)
+                FROM expenses
+                WHERE id >= ?
+                GROUP BY 1, 2, 3
+                ON CONFLICT (year_month, transaction_type, category)
+                DO UPDATE SET total = total + excluded.total, count = count + excluded.count
+            ''', (first_id,))
+            conn.execute(_ROLLUP_INSERT_TRIGGER)
+        
+        return self._insert_bulk('expenses', expenses, chunk_size, insert_chunk)
+    
+    def _insert_bulk(self, table: str, items: Iterable, chunk_size: int,
+                     insert_chunk: Callable) -> int:
+        iterator = iter(items)
+        inserted = 0
+        while True:
+            chunk = [item.to_tuple() for item in islice(iterator, chunk_size)]
+            if not chunk:
+                break
+            # IMMEDIATE: the chunk reads MAX(id) before writing, which a
+            # deferred transaction can't upgrade past a concurrent writer
+            with self.session(immediate=True) as conn:
+                insert_chunk(conn, chunk)
+                # Delivered as this chunk commits, so a later failure can't
+                # leave committed rows hidden behind cached reads
+                self._emit('reload', table, None)
+            inserted += len(chunk)
+        return inserted
+    
+    def get_expenses(self, start_date: Optional[str] = None, 
+                     end_date: Optional[str] = None,
+                     category: Optional[str] = None,
+                     columns: Optional[Sequence[str]] = None) -> List[ExpenseRecord]:
+        """Expenses newest first. columns selects a subset, returned as a
+        namedtuple of just those fields; ExpenseRecords otherwise."""
+        row_type = _row_type('expenses', columns and tuple(columns))
+        clause, params = self._expense_filters(start_date, end_date, category)
+        query = (f"SELECT {_select_columns('expenses', columns=row_type._fields)} "
+                 f"FROM expenses WHERE 1=1" + clause)
+        query += " ORDER BY date DESC, id DESC"
+        
+        with self.session() as conn:
+            return _fetch(conn, row_type, query, params).fetchall()
+    
+    def get_expenses_page(self, after: Optional[Tuple[str, int]] = None,
+                          limit: int = 50,
+                          start_date: Optional[str] = None,
+                          end_date: Optional[str] = None,
+                          category: Optional[str] = None) -> Tuple[List[ExpenseRecord], Optional[Tuple[str, int]]]:
+        """Keyset-paginated get_expenses (newest first).
+        
+        Pass the returned cursor back as `after` to fetch the next page;
+        the cursor is None once there are no more rows.
+        """
+        clause, params = self._expense_filters(start_date, end_date, category)
+        query = f"SELECT {SELECT_COLUMNS['expenses']} FROM expenses WHERE 1=1" + clause
+        if after is not None:
+            query += " AND (date, id) < (?, ?)"
+            params.extend(after)
+        query += " ORDER BY date DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+        
+        with self.session() as conn:
+            rows = _fetch(conn, ExpenseRecord, query, params).fetchall()
+        
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, (last.date, last.id)
+    
+    def delete_expense(self, expense_id: int):
+        with self.session(immediate=True) as conn:
+            row = self._get_row(conn, 'expenses', expense_id)
+            if row is None:
+                return
+            conn.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
+            self._emit('delete', 'expenses', row)
+    
+    @_cached(lambda: [('expenses', None, None)])
+    def get_categories(self) -> List[str]:
+        with self.session() as conn:
+            cursor = conn.execute("SELECT DISTINCT category FROM expenses ORDER BY category")
+            return [row[0] for row in cursor.fetchall()]
+    
+    # Udhar Operations
+    def add_udhar(self, udhar: Udhar) -> int:
+        with self.session(immediate=True) as conn:
+            values = udhar.to_tuple()
+            cursor = conn.execute('''
+                INSERT INTO udhar (person_name, amount, description, date_given, 
+                                 due_date, status, amount_paid)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', values)
+            udhar_id = cursor.lastrowid
+            opening_paid = values[6]
+            if opening_paid > 0:
+                # The payment ledger is the source of truth for amount_paid
+                conn.execute('''
+                    INSERT INTO udhar_payments (udhar_id, amount, payment_date)
+                    VALUES (?, ?, ?)
+                ''', (udhar_id, opening_paid, udhar.date_given))
+            self._emit('insert', 'udhar', self._get_row(conn, 'udhar', udhar_id))
+            return udhar_id
+    
+    def add_udhar_bulk(self, udhar_records: Iterable[Udhar],
+                       chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """Bulk counterpart of add_udhar; see add_expenses_bulk"""
+        def insert_chunk(conn, chunk):
+            first_id = conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM udhar").fetchone()[0] + 1
+            conn.executemany('''
+                INSERT INTO udhar (person_name, amount, description, date_given, 
+                                 due_date, status, amount_paid)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', chunk)
+            # Opening payments, as in add_udhar
+            conn.execute('''
+                INSERT INTO udhar_payments (udhar_id, amount, payment_date)
+                SELECT id, amount_paid, date_given FROM udhar
+                WHERE id >= ? AND amount_paid > 0
+            ''', (first_id,))
+        
+        return self._insert_bulk('udhar', udhar_records, chunk_size, insert_chunk)
+    
+    @_cached(lambda status=None, columns=None: [('udhar', None, None)])
+    def get_udhar_list(self, status: Optional[str] = None,
+                       columns: Optional[Sequence[str]] = None) -> List[UdharRecord]:
+        """Udhar records by date given, newest first; columns as in get_expenses"""
+        row_type = _row_type('udhar', columns and tuple(columns))
+        query = f"SELECT {_select_columns('udhar', columns=row_type._fields)} FROM udhar"
+        params = []
+        
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+            
+        query += " ORDER BY date_given DESC"
+        
+        with self.session() as conn:
+            return _fetch(conn, row_type, query, params).fetchall()
+    
+    def update_udhar_payment(self, udhar_id: int, payment_amount: float):
+        """Record a payment (in rupees); False if the udhar record does not exist"""
+        with self.session(immediate=True) as conn:
+            return self._apply_payment(conn, udhar_id, payment_amount,
+                                       datetime.now().strftime("%Y-%m-%d"))
+    
+    def record_payments(self, payments: Iterable[Tuple[int, float]]) -> int:
+        """Apply many (udhar_id, amount) payments in one write transaction.
+        
+        Returns how many were applied (unknown udhar ids are skipped).
+        """
+        today = datetime.now().strftime("%Y-%m-%d")
+        with self.session(immediate=True) as conn:
+            return sum(self._apply_payment(conn, udhar_id, amount, today)
+                       for udhar_id, amount in payments)
+    
+    def _apply_payment(self, conn, udhar_id: int, payment_amount: float,
+                       payment_date: str) -> bool:
+        payment = Money.of(payment_amount).paise
+        # One statement: SET expressions all see the pre-update row, so the
+        # increment and the new status cannot be split by another writer
+        cursor = conn.execute(f'''
+            UPDATE udhar
+            SET amount_paid = amount_paid + :payment,
+                status = {_status_case('amount_paid + :payment')}
+            WHERE id = :id
+        ''', {'payment': payment, 'id': udhar_id})
+        if cursor.rowcount == 0:
+            return False
+        
+        conn.execute('''
+            INSERT INTO udhar_payments (udhar_id, amount, payment_date)
+            VALUES (?, ?, ?)
+        ''', (udhar_id, payment, payment_date))
+        
+        self._emit('update', 'udhar', self._get_row(conn, 'udhar', udhar_id))
+        return True
+    
+    def delete_udhar(self, udhar_id: int):
+        with self.session(immediate=True) as conn:
+            row = self._get_row(conn, 'udhar', udhar_id)
+            if row is None:
+                return
+            conn.execute("DELETE FROM udhar_payments WHERE udhar_id = ?", (udhar_id,))
+            conn.execute("DELETE FROM udhar WHERE id = ?", (udhar_id,))
+            self._emit('delete', 'udhar', row)
+    
+    # Analytics
+    @_cached(lambda start_date=None, end_date=None, category=None:
+             [('expenses', _month(start_date), _month(end_date))])
+    def get_totals(self, start_date: Optional[str] = None,
+                   end_date: Optional[str] = None,
+                   category: Optional[str] = None) -> dict:
+        """Income/expense totals over the same filters as get_expenses"""
+        clause, params = self._expense_filters(start_date, end_date, category)
+        query = ("SELECT transaction_type, COALESCE(SUM(amount), 0) "
+                 "FROM expenses WHERE 1=1" + clause +
+                 " GROUP BY transaction_type")
+        
+        with self.session() as conn:
+            sums = dict(conn.execute(query, params).fetchall())
+        
+        # Integer paise until here, so the net is exact too
+        total_income = sums.get('income', 0)
+        total_expense = sums.get('expense', 0)
+        return {
+            'total_income': _rupees(total_income),
+            'total_expense': _rupees(total_expense),
+            'net_savings': _rupees(total_income - total_expense)
+        }
+    
+    @_cached(lambda year, month: [('expenses', f"{year}-{month:02d}", f"{year}-{month:02d}"),
+                                  ('udhar', None, None), ('budgets', None, None)])
+    def get_monthly_summary(self, year: int, month: int) -> dict:
+        """Month totals, category breakdown, pending udhar and budgets in
+        one query, answered from monthly_rollup rather than the raw
+        expenses. budgets maps each budgeted category to its limit."""
+        with self.session() as conn:
+            rows = conn.execute('''
+                SELECT transaction_type, category, total
+                FROM monthly_rollup
+                WHERE year_month = ?
+                UNION ALL
+                SELECT 'udhar', NULL, COALESCE(SUM(amount - amount_paid), 0)
+                FROM udhar
+                WHERE status IN ('pending', 'partial')
+                UNION ALL
+                SELECT 'budget', category, monthly_limit
+                FROM budgets
+            ''', (f"{year}-{month:02d}",)).fetchall()
+        
+        total_expense = 0
+        total_income = 0
+        pending_udhar = 0
+        category_breakdown = []
+        budgets = {}
+        for trans_type, category, total in rows:
+            if trans_type == 'expense':
+                total_expense += total
+                category_breakdown.append((category, _rupees(total)))
+            elif trans_type == 'income':
+                total_income += total
+            elif trans_type == 'budget':
+                budgets[category] = _rupees(total)
+            else:
+                pending_udhar = total
+        category_breakdown.sort(key=lambda item: item[1], reverse=True)
+        
+        return {
+            'total_expense': _rupees(total_expense),
+            'total_income': _rupees(total_income),
+            'net_savings': _rupees(total_income - total_expense),
+            'category_breakdown': category_breakdown,
+            'pending_udhar': _rupees(pending_udhar),
+            'budgets': budgets
+        }
+    
+    @_cached(lambda start_month, end_month, granularity='month':
+             [('expenses', start_month, end_month), ('udhar', None, None)])
+    def get_range_summary(self, start_month: str, end_month: str,
+                          granularity: str = 'month') -> dict:
+        """Income/expense time series for start_month..end_month (YYYY-MM,
+        inclusive) bucketed by 'month', 'week' or 'day', from one grouped
+        query. Periods without transactions are filled with zeros. Also
+        returns the range's category breakdown and the pending udhar, as
+        get_monthly_summary does."""
+        if granularity not in RANGE_FORMATS:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        
+        start_date = f"{start_month}-01"
+        end_date = _next_month_start(end_month)
+        
+        with self.session() as conn:
+            if granularity == 'month':
+                # Month buckets are exactly what monthly_rollup stores
+                rows = conn.execute('''
+                    SELECT year_month,
+                           SUM(CASE WHEN transaction_type = 'income' THEN total ELSE 0 END),
+                           SUM(CASE WHEN transaction_type = 'expense' THEN total ELSE 0 END)
+                    FROM monthly_rollup
+                    WHERE year_month >= ? AND year_month <= ?
+                    GROUP BY year_month
+                ''', (start_month, end_month)).fetchall()
+            else:
+                rows = conn.execute('''
+                    SELECT strftime(?, date) AS period,
+                           SUM(CASE WHEN transaction_type = 'income' THEN amount ELSE 0 END),
+                           SUM(CASE WHEN transaction_type = 'expense' THEN amount ELSE 0 END)
+                    FROM expenses
+                    WHERE date >= ? AND date < ?
+                    GROUP BY period
+                ''', (RANGE_FORMATS[granularity], start_date, end_date)).fetchall()
+            categories = conn.execute('''
+                SELECT category, SUM(total)
+                FROM monthly_rollup
+                WHERE transaction_type = 'expense'
+                  AND year_month >= ? AND year_month <= ?
+                GROUP BY category
+                ORDER BY 2 DESC
+            ''', (start_month, end_month)).fetchall()
+            pending_udhar = conn.execute('''
+                SELECT COALESCE(SUM(amount - amount_paid), 0)
+                FROM udhar
+                WHERE status IN ('pending', 'partial')
+            ''').fetchone()[0]
+        
+        sums = {}
+        for period, income, expense in rows:
+            if granularity == 'week':
+                period = _merge_week(period, start_date)
+            previous_income, previous_expense = sums.get(period, (0, 0))
+            sums[period] = (previous_income + income, previous_expense + expense)
+        series = []
+        for period in _range_periods(start_date, end_date, granularity):
+            income, expense = sums.get(period, (0, 0))
+            series.append({
+                'period': period,
+                'income': _rupees(income),
+                'expense': _rupees(expense),
+                'net': _rupees(income - expense)
+            })
+        
+        total_income = sum(income for income, _ in sums.values())
+        total_expense = sum(expense for _, expense in sums.values())
+        return {
+            'series': series,
+            'total_income': _rupees(total_income),
+            'total_expense': _rupees(total_expense),
+            'net_savings': _rupees(total_income - total_expense),
+            'category_breakdown': [(category, _rupees(total)) for category, total in categories],
+            'pending_udhar': _rupees(pending_udhar)
+        }
+    
+    # Budgets
+    def set_budget(self, category: str, monthly_limit: float):
+        """Set or replace a category's monthly spending limit (rupees)"""
+        limit = Money.of(monthly_limit).paise
+        if limit <= 0:
+            raise ValueError("Budget must be greater than zero")
+        with self.session(immediate=True) as conn:
+            conn.execute('''
+                INSERT INTO budgets (category, monthly_limit) VALUES (?, ?)
+                ON CONFLICT (category) DO UPDATE SET monthly_limit = excluded.monthly_limit
+            ''', (category, limit))
+            month = datetime.now().strftime("%Y-%m")
+            self._emit('update', 'budgets', BudgetStatus(
+                category, month, _rupees(limit), _rupees(self._month_spend(conn, category, month))))
+    
+    def remove_budget(self, category: str) -> bool:
+        """Drop a category's budget; False if it had none"""
+        with self.session(immediate=True) as conn:
+            row = conn.execute("SELECT monthly_limit FROM budgets WHERE category = ?",
+                               (category,)).fetchone()
+            if row is None:
+                return False
+            conn.execute("DELETE FROM budgets WHERE category = ?", (category,))
+            month = datetime.now().strftime("%Y-%m")
+            self._emit('delete', 'budgets', BudgetStatus(
+                category, month, _rupees(row[0]), _rupees(self._month_spend(conn, category, month))))
+            return True
+    
+    @_cached(lambda year, month: [('expenses', f"{year}-{month:02d}", f"{year}-{month:02d}"),
+                                  ('budgets', None, None)])
+    def get_budget_status(self, year: int, month: int) -> List[BudgetStatus]:
+        """Every budgeted category's spend in the month, most used first"""
+        year_month = f"{year}-{month:02d}"
+        with self.session() as conn:
+            rows = conn.execute('''
+                SELECT b.category, b.monthly_limit, COALESCE(r.total, 0)
+                FROM budgets b
+                LEFT JOIN monthly_rollup r
+                  ON r.year_month = ? AND r.transaction_type = 'expense'
+                 AND r.category = b.category
+            ''', (year_month,)).fetchall()
+        statuses = [BudgetStatus(category, year_month, _rupees(limit), _rupees(spent))
+                    for category, limit, spent in rows]
+        statuses.sort(key=lambda status: status.fraction, reverse=True)
+        return statuses
+    
+    def _month_spend(self, conn, category: str, year_month: str) -> int:
+        # monthly_rollup is the month-to-date counter: its triggers add and
+        # subtract each expense as it is inserted or deleted
+        row = conn.execute('''
+            SELECT total FROM monthly_rollup
+            WHERE year_month = ? AND transaction_type = 'expense' AND category = ?
+        ''', (year_month, category)).fetchone()
+        return row[0] if row else 0
+    
+    def _check_budget(self, conn, category: str, year_month: str, added: int):
+        """Emit 'over_budget' if the `added` paise just inserted took the
+        category's month past its limit; not again while it stays over"""
+        # Two primary-key lookups, whatever the size of the ledger
+        row = conn.execute("SELECT monthly_limit FROM budgets WHERE category = ?",
+                           (category,)).fetchone()
+        if row is None:
+            return
+        spent = self._month_spend(conn, category, year_month)
+        if spent > row[0] >= spent - added:
+            self._emit('over_budget', 'budgets', BudgetStatus(
+                category, year_month, _rupees(row[0]), _rupees(spent)))
+    
+    # Streaming reads
+    def table_columns(self, table: str) -> List[Tuple[str, str]]:
+        """(name, type) for each column of an exportable table, as iter_rows
+        yields them: money columns come out as REAL rupees"""
+        if table not in STREAM_FILTERS:
+            raise ValueError(f"Unknown table: {table}")
+        with self.session() as conn:
+            return [(name, 'REAL' if name in MONEY_COLUMNS[table] else declared)
+                    for _, name, declared, *_ in
+                    conn.execute(f"PRAGMA table_info({table})").fetchall()]
+    
+    def iter_rows(self, table: str, start_date: Optional[str] = None,
+                  end_date: Optional[str] = None,
+                  category: Optional[str] = None,
+                  chunk_size: int = 1000) -> Iterator[Tuple]:
+        """Stream a table's rows in id order, fetchmany(chunk_size) at a time.
+        
+        Date filters apply to the table's date column; category only
+        applies to expenses. The rows are read through a private
+        connection holding one read transaction, so they form a consistent
+        snapshot and an abandoned generator touches no session state of the
+        thread that later closes it. Close the generator when done with it.
+        """
+        date_column, category_column = STREAM_FILTERS[table]
+        query = f"SELECT {SELECT_COLUMNS[table]} FROM {table} WHERE 1=1"
+        params = []
+        
+        if start_date:
+            query += f" AND {date_column} >= ?"
+            params.append(start_date)
+        if end_date:
+            query += f" AND {date_column} <= ?"
+            params.append(end_date)
+        if category and category_column:
+            query += f" AND {category_column} = ?"
+            params.append(category)
+        query += " ORDER BY id"
+        
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            cursor = _fetch(conn, ROW_TYPES[table], query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+    
+    # People
+    @_cached(lambda person_name=None: [('udhar', None, None)])
+    def get_person_balances(self, person_name: Optional[str] = None) -> List[dict]:
+        """Per-person totals lent, paid and outstanding plus the oldest open
+        due date, from one grouped query. Optionally for a single person."""
+        query = f'''
+            SELECT {PERSON_KEY} AS person_key,
+                   MAX(trim(person_name)),
+                   COUNT(*),
+                   SUM(amount),
+                   SUM(amount_paid),
+                   SUM(CASE WHEN status != 'cleared' THEN amount - amount_paid ELSE 0 END),
+                   MIN(CASE WHEN status != 'cleared' THEN due_date END)
+            FROM udhar
+        '''
+        params = []
+        if person_name is not None:
+            query += f" WHERE {PERSON_KEY} = lower(trim(?))"
+            params.append(person_name)
+        query += " GROUP BY person_key ORDER BY 6 DESC"
+        
+        with self.session() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        return [
+            {
+                'person_key': key, 'person_name': name, 'loans': loans,
+                'total_lent': _rupees(lent), 'total_paid': _rupees(paid),
+                'outstanding': _rupees(outstanding), 'oldest_due_date': oldest_due
+            }
+            for key, name, loans, lent, paid, outstanding, oldest_due in rows
+        ]
+    
+    def get_person_history(self, person_name: str,
+                           after: Optional[Tuple[str, str, int]] = None,
+                           limit: int = 30) -> Tuple[List[HistoryEntry], Optional[Tuple[str, str, int]]]:
+        """Keyset-paginated loans and payments for one person, newest first.
+        
+        Rows are HistoryEntry(kind, id, date, amount, detail, status) with
+        kind 'loan' or 'payment'; pass the returned cursor back as `after`.
+        """
+        query = f'''
+            SELECT * FROM (
+                SELECT 'loan' AS kind, id, date_given AS date, amount / 100.0 AS amount,
+                       COALESCE(description, '') AS detail, status
+                FROM udhar
+                WHERE {PERSON_KEY} = lower(trim(:name))
+                UNION ALL
+                SELECT 'payment', p.id, p.payment_date, p.amount / 100.0,
+                       COALESCE(u.description, ''), NULL
+                FROM udhar u
+                JOIN udhar_payments p ON p.udhar_id = u.id
+                WHERE {PERSON_KEY.replace('person_name', 'u.person_name')} = lower(trim(:name))
+            )
+        '''
+        params = {'name': person_name, 'limit': limit + 1}
+        if after is not None:
+            query += " WHERE (date, kind, id) < (:date, :kind, :id)"
+            params.update(zip(('date', 'kind', 'id'), after))
+        query += " ORDER BY date DESC, kind DESC, id DESC LIMIT :limit"
+        
+        with self.session() as conn:
+            rows = _fetch(conn, HistoryEntry, query, params).fetchall()
+        
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, (last.date, last.kind, last.id)
+    
+    # Search
+    def has_search_index(self) -> bool:
+        """Whether the FTS5 tables exist (found by init_database)"""
+        return self._search_index
+    
+    def search(self, query: str, limit: int = 20, cursor: Optional[int] = None,
+               scope: Optional[str] = None) -> Tuple[List[Tuple[str, Tuple]], Optional[int]]:
+        """Ranked full-text search over expense descriptions/categories and
+        udhar person names/descriptions.
+        
+        Returns ([(table, row), ...], next_cursor): row has the same shape as
+        get_expenses/get_udhar_list rows, best matches first. scope limits
+        the search to 'expenses' or 'udhar'. Pass next_cursor back as
+        `cursor` for the next page; it is None after the last page.
+        """
+        tables = [scope] if scope else list(SEARCH_INDEXES)
+        offset = cursor or 0
+        wanted = offset + limit + 1
+        
+        if self.has_search_index():
+            match = _fts_query(query)
+            if not match:
+                return [], None
+            with self.session() as conn:
+                ranked = []
+                for table in tables:
+                    fts = SEARCH_INDEXES[table][0]
+                    rows = conn.execute(f'''
+                        SELECT {fts}.rank, {_select_columns(table, 't')}
+                        FROM {fts}
+                        JOIN {table} t ON t.id = {fts}.rowid
+                        WHERE {fts} MATCH ?
+                        ORDER BY {fts}.rank
+                        LIMIT ?
+                    ''', (match, wanted)).fetchall()
+                    make = ROW_TYPES[table]._make
+                    ranked.append([(row[0], table, make(row[1:])) for row in rows])
+            # Both lists are sorted by bm25 rank (lower is better)
+            results = [(table, row) for _, table, row in
+                       heapq.merge(*ranked, key=itemgetter(0))]
+        else:
+            words = re.findall(r"\w+", query)
+            if not words:
+                return [], None
+            with self.session() as conn:
+                results = []
+                for table in tables:
+                    columns = SEARCH_INDEXES[table][1]
+                    condition = " AND ".join(
+                        "(" + " OR ".join(f"{c} LIKE ?" for c in columns) + ")"
+                        for _ in words)
+                    params = [f"%{word}%" for word in words for _ in columns]
+                    rows = _fetch(
+                        conn, ROW_TYPES[table],
+                        f"SELECT {SELECT_COLUMNS[table]} FROM {table} "
+                        f"WHERE {condition} ORDER BY id DESC LIMIT ?",
+                        params + [wanted]).fetchall()
+                    results.extend((table, row) for row in rows)
+        
+        page = results[offset:offset + limit]
+        next_cursor = offset + limit if len(results) > offset + limit else None
+        return page, next_cursor
+    
+    # Payment reconciliation
+    def reconcile_udhar_payments(self, fix: bool = True) -> List[dict]:
+        """Recompute amount_paid/status from udhar_payments in one grouped
+        query and report every udhar row that has drifted from it.
+        
+        With fix=True the drifted rows are corrected in the same write
+        transaction.
+        """
+        ledger = '''
+            SELECT u.id, u.amount, u.amount_paid, u.status,
+                   COALESCE(p.paid, 0) AS ledger_paid
+            FROM udhar u
+            LEFT JOIN (
+                SELECT udhar_id, SUM(amount) AS paid
+                FROM udhar_payments
+                GROUP BY udhar_id
+            ) p ON p.udhar_id = u.id
+        '''
+        with self.session(immediate=fix) as conn:
+            rows = conn.execute(f'''
+                SELECT id, amount, amount_paid, status, ledger_paid,
+                       {_status_case('ledger_paid')} AS ledger_status
+                FROM ({ledger})
+                WHERE amount_paid != ledger_paid
+                   OR status != {_status_case('ledger_paid')}
+            ''').fetchall()
+            
+            if fix and rows:
+                conn.executemany(
+                    "UPDATE udhar SET amount_paid = ?, status = ? WHERE id = ?",
+                    [(ledger_paid, ledger_status, udhar_id)
+                     for udhar_id, _, _, _, ledger_paid, ledger_status in rows])
+                self._emit('reload', 'udhar', None)
+        
+        return [
+            {
+                'udhar_id': udhar_id, 'amount': _rupees(amount),
+                'amount_paid': _rupees(paid), 'status': status,
+                'ledger_paid': _rupees(ledger_paid), 'ledger_status': ledger_status
+            }
+            for udhar_id, amount, paid, status, ledger_paid, ledger_status in rows
+        ]
+    
+    # Rollup maintenance
+    def rebuild_monthly_rollup(self):
+        """Recompute monthly_rollup from scratch out of the raw expenses"""
+        with self.session(immediate=True) as conn:
+            conn.execute("DELETE FROM monthly_rollup")
+            conn.execute('''
+                INSERT INTO monthly_rollup (year_month, transaction_type, category, total, count)
+            ''' + _ROLLUP_SOURCE)
+        if self.cache is not None:
+            # Summaries were answered from the old rollup
+            self.cache.clear()
+    
+    def check_monthly_rollup(self) -> List[dict]:
+        """Compare monthly_rollup against the raw expenses.
+        
+        Returns one entry per mismatching (month, type, category) group;
+        an empty list means the rollup is consistent.
+        """
+        with self.session() as conn:
+            rows = conn.execute(f'''
+                WITH raw AS ({_ROLLUP_SOURCE})
+                SELECT r.year_month, r.transaction_type, r.category,
+                       r.total, r.count, m.total, m.count
+                FROM raw r
+                LEFT JOIN monthly_rollup m
+                  ON m.year_month = r.year_month
+                 AND m.transaction_type = r.transaction_type
+                 AND m.category = r.category
+                WHERE m.count IS NULL OR m.count != r.count
+                   OR m.total != r.total
+                UNION ALL
+                SELECT m.year_month, m.transaction_type, m.category,
+                       NULL, NULL, m.total, m.count
+                FROM monthly_rollup m
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM raw r
+                    WHERE r.year_month = m.year_month
+                      AND r.transaction_type = m.transaction_type
+                      AND r.category = m.category
+                )
+            ''').fetchall()
+        
+        return [
+            {
+                'year_month': ym, 'transaction_type': tt, 'category': cat,
+                'expected_total': None if raw_total is None else _rupees(raw_total),
+                'expected_count': raw_count,
+                'rollup_total': _rupees(total), 'rollup_count': count
+            }
+            for ym, tt, cat, raw_total, raw_count, total, count in rows
+        ]
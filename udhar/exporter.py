@@ -0,0 +1,193 @@
+# udhar/exporter.py
+"""Streaming export of the ledger tables to CSV, JSON Lines or a compact
+columnar binary file.
+
+Rows are pulled from Database.iter_rows (fetchmany chunks) through
+generators, so memory stays flat however large the ledger is.
+
+Columnar layout (all integers little-endian):
+    b'UDCOL1\\n'
+    u32 header length, UTF-8 JSON {"table", "columns": [{"name", "type"}]}
+    row groups, each:
+        u32 row count (0 marks the end of the file)
+        per column: u32 byte length, then the encoded column
+    column encodings:
+        int   -> null bitmap (1 bit per row) + int64 values
+        float -> null bitmap + float64 values
+        str   -> u32 dictionary length + JSON list of distinct values,
+                 then uint32 codes (0xFFFFFFFF = null)
+"""
+import csv
+import json
+import os
+import struct
+import sys
+from array import array
+from contextlib import closing
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+MAGIC = b'UDCOL1\n'
+ROW_GROUP_SIZE = 65536
+NULL_CODE = 0xFFFFFFFF
+FORMATS = {
+    'csv': '.csv',
+    'jsonl': '.jsonl',
+    'columnar': '.udc',
+}
+TABLES = ('expenses', 'udhar', 'udhar_payments')
+
+def _column_type(declared: str) -> str:
+    declared = declared.upper()
+    if declared.startswith('INT'):
+        return 'int'
+    if declared in ('REAL', 'FLOAT', 'DOUBLE'):
+        return 'float'
+    return 'str'
+
+def write_csv(f, columns: List[str], rows: Iterator[Tuple]) -> int:
+    writer = csv.writer(f)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+def write_jsonl(f, columns: List[str], rows: Iterator[Tuple]) -> int:
+    count = 0
+    for row in rows:
+        f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+        f.write('\n')
+        count += 1
+    return count
+
+def _le(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def _encode_column(kind: str, values: list) -> bytes:
+    if kind == 'str':
+        codes = array('I')
+        dictionary = {}
+        for value in values:
+            if value is None:
+                codes.append(NULL_CODE)
+            else:
+                codes.append(dictionary.setdefault(str(value), len(dictionary)))
+        encoded = json.dumps(list(dictionary), ensure_ascii=False).encode('utf-8')
+        return struct.pack('<I', len(encoded)) + encoded + _le(codes)
+
+    bitmap = bytearray((len(values) + 7) // 8)
+    numbers = array('q' if kind == 'int' else 'd')
+    for index, value in enumerate(values):
+        if value is None:
+            bitmap[index >> 3] |= 1 << (index & 7)
+            numbers.append(0)
+        else:
+            numbers.append(value)
+    return bytes(bitmap) + _le(numbers)
+
+def write_columnar(f, table: str, columns: List[Tuple[str, str]],
+                   rows: Iterator[Tuple]) -> int:
+    kinds = [_column_type(declared) for _, declared in columns]
+    header = json.dumps({
+        'table': table,
+        'columns': [{'name': name, 'type': kind}
+                    for (name, _), kind in zip(columns, kinds)]
+    }).encode('utf-8')
+    f.write(MAGIC)
+    f.write(struct.pack('<I', len(header)))
+    f.write(header)
+
+    count = 0
+    rows = iter(rows)
+    while True:
+        group = list(islice(rows, ROW_GROUP_SIZE))
+        if not group:
+            break
+        f.write(struct.pack('<I', len(group)))
+        for kind, values in zip(kinds, zip(*group)):
+            encoded = _encode_column(kind, values)
+            f.write(struct.pack('<I', len(encoded)))
+            f.write(encoded)
+        count += len(group)
+    f.write(struct.pack('<I', 0))
+    return count
+
+def _decode_column(kind: str, data: bytes, count: int) -> list:
+    if kind == 'str':
+        (size,) = struct.unpack_from('<I', data)
+        dictionary = json.loads(data[4:4 + size].decode('utf-8'))
+        codes = array('I')
+        codes.frombytes(data[4 + size:])
+        if sys.byteorder == 'big':
+            codes.byteswap()
+        return [None if code == NULL_CODE else dictionary[code] for code in codes]
+
+    bitmap_size = (count + 7) // 8
+    bitmap = data[:bitmap_size]
+    numbers = array('q' if kind == 'int' else 'd')
+    numbers.frombytes(data[bitmap_size:])
+    if sys.byteorder == 'big':
+        numbers.byteswap()
+    return [None if bitmap[i >> 3] & (1 << (i & 7)) else numbers[i]
+            for i in range(count)]
+
+def read_columnar(path: str) -> Iterator[dict]:
+    """Stream rows back out of a columnar export as dicts"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a columnar export")
+        (size,) = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(size).decode('utf-8'))
+        names = [column['name'] for column in header['columns']]
+        kinds = [column['type'] for column in header['columns']]
+        while True:
+            (count,) = struct.unpack('<I', f.read(4))
+            if count == 0:
+                return
+            columns = []
+            for kind in kinds:
+                (length,) = struct.unpack('<I', f.read(4))
+                columns.append(_decode_column(kind, f.read(length), count))
+            for values in zip(*columns):
+                yield dict(zip(names, values))
+
+def export_table(db, table: str, path: str, fmt: str = 'csv',
+                 start_date: Optional[str] = None,
+                 end_date: Optional[str] = None,
+                 category: Optional[str] = None) -> int:
+    """Write one table to path; returns the number of rows written"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+    columns = db.table_columns(table)
+    # Closed here, on this thread, even when a write fails partway
+    with closing(db.iter_rows(table, start_date, end_date, category)) as rows:
+        if fmt == 'columnar':
+            with open(path, 'wb') as f:
+                return write_columnar(f, table, columns, rows)
+
+        names = [name for name, _ in columns]
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            if fmt == 'csv':
+                return write_csv(f, names, rows)
+            return write_jsonl(f, names, rows)
+
+def export_ledger(db, directory: str, fmt: str = 'csv',
+                  start_date: Optional[str] = None,
+                  end_date: Optional[str] = None,
+                  category: Optional[str] = None) -> dict:
+    """Export expenses, udhar and udhar_payments into directory.
+
+    Returns {table: (path, rows written)}.
+    """
+    os.makedirs(directory, exist_ok=True)
+    results = {}
+    for table in TABLES:
+        path = os.path.join(directory, table + FORMATS[fmt])
+        count = export_table(db, table, path, fmt, start_date, end_date, category)
+        results[table] = (path, count)
+    return results
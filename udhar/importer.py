@@ -0,0 +1,196 @@
+# udhar/importer.py
+"""Streaming CSV / JSON importer for expenses and udhar history.
+
+Files are read record by record and fed to the Database bulk APIs through
+a generator pipeline, so memory use does not grow with the file size.
+
+Expense columns: amount, category, description, date, transaction_type
+Udhar columns:   person_name, amount, description, date_given, due_date,
+                 status, amount_paid
+                 (status may be left blank; it follows from amount_paid)
+"""
+import csv
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterator, List, Tuple
+
+from .models import Expense, Money, Udhar, TransactionType, UdharStatus, validate_amount
+
+# Enum lookups by value, without Enum.__call__ overhead per row
+_TRANSACTION_TYPES = {t.value: t for t in TransactionType}
+_UDHAR_STATUSES = {s.value: s for s in UdharStatus}
+
+# Keep at most this many error details; the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    error_count: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+    
+    def add_error(self, line: int, reason: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, reason))
+
+def read_records(path: str) -> Iterator[Tuple[int, dict]]:
+    """Yield (line number, record dict) from a .csv, .jsonl or .json file"""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, newline='', encoding='utf-8') as f:
+        if ext == '.csv':
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+        elif ext in ('.jsonl', '.ndjson'):
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    # Reported per line instead of aborting the import
+                    record = e
+                yield line_no, record
+        elif ext == '.json':
+            yield from _iter_json_array(f)
+        else:
+            raise ValueError(f"Unsupported file type: {ext}")
+
+def _iter_json_array(f, read_size: int = 1 << 16) -> Iterator[Tuple[int, dict]]:
+    """Incrementally decode a top-level JSON array of objects.
+    
+    The number yielded with each object is its 1-based position.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(read_size).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError("Expected a JSON array")
+    buffer = buffer[1:]
+    position = 0
+    eof = False
+    while True:
+        buffer = buffer.lstrip().lstrip(',').lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Object spans the chunk boundary: read more and retry
+            more = f.read(read_size)
+            eof = not more
+            buffer += more
+            continue
+        position += 1
+        yield position, record
+        buffer = buffer[end:]
+        if len(buffer) < read_size and not eof:
+            more = f.read(read_size)
+            eof = not more
+            buffer += more
+
+def _text(record: dict, key: str) -> str:
+    value = record.get(key)
+    return '' if value is None else str(value).strip()
+
+def _check_date(value: str, name: str) -> str:
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"invalid {name} {value!r} (expected YYYY-MM-DD)")
+    return value
+
+def _amount(record: dict, key: str = 'amount', allow_zero: bool = False) -> float:
+    valid, amount = validate_amount(_text(record, key), allow_zero)
+    if not valid:
+        raise ValueError(f"invalid {key} {record.get(key)!r}")
+    return amount
+
+def _udhar_status(amount: float, paid: float) -> UdharStatus:
+    """The status the database derives for `paid` of `amount` (_status_case)"""
+    paid_paise = Money.of(paid).paise
+    if paid_paise >= Money.of(amount).paise:
+        return UdharStatus.CLEARED
+    if paid_paise > 0:
+        return UdharStatus.PARTIAL
+    return UdharStatus.PENDING
+
+def _lookup(choices: dict, value: str, name: str):
+    try:
+        return choices[value]
+    except KeyError:
+        raise ValueError(f"invalid {name} {value!r}")
+
+def parse_expense(record: dict) -> Expense:
+    category = _text(record, 'category')
+    if not category:
+        raise ValueError("missing category")
+    return Expense(
+        id=None,
+        amount=_amount(record),
+        category=category,
+        description=_text(record, 'description'),
+        date=_check_date(_text(record, 'date'), 'date'),
+        transaction_type=_lookup(_TRANSACTION_TYPES, _text(record, 'transaction_type') or 'expense',
+                                 'transaction_type')
+    )
+
+def parse_udhar(record: dict) -> Udhar:
+    person = _text(record, 'person_name')
+    if not person:
+        raise ValueError("missing person_name")
+    due_date = _text(record, 'due_date') or None
+    if due_date:
+        _check_date(due_date, 'due_date')
+    amount = _amount(record)
+    paid = _amount(record, 'amount_paid', allow_zero=True) if _text(record, 'amount_paid') else 0.0
+    if Money.of(paid).paise > Money.of(amount).paise:
+        raise ValueError(f"amount_paid {paid} exceeds amount {amount}")
+    # The status follows from amount_paid; a contradicting one would leave
+    # the row out of step with its opening payment
+    status = _udhar_status(amount, paid)
+    given = _text(record, 'status')
+    if given and _lookup(_UDHAR_STATUSES, given, 'status') is not status:
+        raise ValueError(f"status {given!r} does not match amount_paid {paid} of {amount}")
+    return Udhar(
+        id=None,
+        person_name=person,
+        amount=amount,
+        description=_text(record, 'description'),
+        date_given=_check_date(_text(record, 'date_given'), 'date_given'),
+        due_date=due_date,
+        status=status,
+        amount_paid=paid
+    )
+
+PARSERS = {
+    'expenses': parse_expense,
+    'udhar': parse_udhar,
+}
+
+def _valid_records(path: str, parse, report: ImportReport):
+    for line, record in read_records(path):
+        if isinstance(record, json.JSONDecodeError):
+            report.add_error(line, f"bad JSON: {record}")
+            continue
+        if not isinstance(record, dict):
+            report.add_error(line, f"expected an object, got {type(record).__name__}")
+            continue
+        try:
+            yield parse(record)
+        except (ValueError, TypeError) as e:
+            report.add_error(line, str(e))
+
+def import_file(db, path: str, kind: str = 'expenses') -> ImportReport:
+    """Stream path into the database; bad records are skipped and reported"""
+    report = ImportReport()
+    records = _valid_records(path, PARSERS[kind], report)
+    if kind == 'expenses':
+        report.imported = db.add_expenses_bulk(records)
+    else:
+        report.imported = db.add_udhar_bulk(records)
+    return report
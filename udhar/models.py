@@ -0,0 +1,179 @@
+# udhar/models.py
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import NamedTuple, Optional, Tuple, Union
+from enum import Enum
+
+class TransactionType(Enum):
+    EXPENSE = "expense"
+    INCOME = "income"
+
+class UdharStatus(Enum):
+    PENDING = "pending"
+    PARTIAL = "partial"
+    CLEARED = "cleared"
+
+@dataclass(frozen=True, order=True)
+class Money:
+    """An exact amount of money as integer paise (1/100 rupee).
+    
+    The database stores and sums paise, so totals never pick up float
+    error; rupee floats only appear at the edges for input and display.
+    """
+    paise: int = 0
+    
+    @classmethod
+    def of(cls, rupees: Union[float, int, str, Decimal, 'Money']) -> 'Money':
+        """Convert a rupee amount, rounding half-up to the nearest paisa.
+        Raises ValueError for anything that isn't a finite number."""
+        if isinstance(rupees, Money):
+            return rupees
+        # str() first so 0.1 + 0.2 becomes 0.30, not 0.3000000000000000444
+        try:
+            value = Decimal(str(rupees))
+            if not value.is_finite():
+                raise ValueError(f"Amount must be finite: {rupees!r}")
+            value = value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        except InvalidOperation:
+            # Not a number, or too many digits to hold to the paisa
+            raise ValueError(f"Invalid amount: {rupees!r}") from None
+        return cls(int(value * 100))
+    
+    @property
+    def rupees(self) -> float:
+        return self.paise / 100
+    
+    def __add__(self, other: 'Money') -> 'Money':
+        return Money(self.paise + other.paise)
+    
+    def __sub__(self, other: 'Money') -> 'Money':
+        return Money(self.paise - other.paise)
+    
+    def __neg__(self) -> 'Money':
+        return Money(-self.paise)
+    
+    def __bool__(self):
+        return self.paise != 0
+    
+    def __str__(self):
+        sign = '-' if self.paise < 0 else ''
+        rupees, paise = divmod(abs(self.paise), 100)
+        return f"{sign}₹{rupees:,}.{paise:02d}"
+
+def validate_amount(amount_str: str, allow_zero: bool = False) -> Tuple[bool, float]:
+    """Validate and convert amount string to float: finite and > 0
+    (>= 0 with allow_zero). Used by the screens and the importer."""
+    try:
+        amount = float(amount_str)
+    except ValueError:
+        return False, 0
+    if not math.isfinite(amount) or amount < 0 or (amount == 0 and not allow_zero):
+        return False, 0
+    return True, amount
+
+@dataclass
+class Expense:
+    id: Optional[int]
+    amount: float
+    category: str
+    description: str
+    date: str
+    transaction_type: TransactionType
+    
+    def to_tuple(self):
+        """Column values for an INSERT, with the amount in paise"""
+        return (Money.of(self.amount).paise, self.category, self.description, 
+                self.date, self.transaction_type.value)
+
+@dataclass
+class Udhar:
+    id: Optional[int]
+    person_name: str
+    amount: float
+    description: str
+    date_given: str
+    due_date: Optional[str]
+    status: UdharStatus
+    amount_paid: float = 0.0
+    
+    @property
+    def remaining_amount(self):
+        return self.amount - self.amount_paid
+    
+    def to_tuple(self):
+        """Column values for an INSERT, with amounts in paise"""
+        return (self.person_name, Money.of(self.amount).paise, self.description,
+                self.date_given, self.due_date, self.status.value,
+                Money.of(self.amount_paid).paise)
+
+# Rows as the Database returns them: amounts in rupees, enums as their
+# string values. Tuples underneath (no per-row __dict__), so positional
+# unpacking keeps working; field order is the table's column order.
+class ExpenseRecord(NamedTuple):
+    id: int
+    amount: float
+    category: str
+    description: Optional[str]
+    date: str
+    transaction_type: str
+    created_at: str
+    
+    def to_model(self) -> Expense:
+        return Expense(self.id, self.amount, self.category, self.description or '',
+                       self.date, TransactionType(self.transaction_type))
+
+class UdharRecord(NamedTuple):
+    id: int
+    person_name: str
+    amount: float
+    description: Optional[str]
+    date_given: str
+    due_date: Optional[str]
+    status: str
+    amount_paid: float
+    created_at: str
+    
+    @property
+    def remaining_amount(self) -> float:
+        return self.amount - self.amount_paid
+    
+    def to_model(self) -> Udhar:
+        return Udhar(self.id, self.person_name, self.amount, self.description or '',
+                     self.date_given, self.due_date, UdharStatus(self.status),
+                     self.amount_paid)
+
+class PaymentRecord(NamedTuple):
+    id: int
+    udhar_id: int
+    amount: float
+    payment_date: str
+
+class HistoryEntry(NamedTuple):
+    """A loan or payment in Database.get_person_history"""
+    kind: str
+    id: int
+    date: str
+    amount: float
+    detail: str
+    status: Optional[str]
+
+class BudgetStatus(NamedTuple):
+    """A category's spend for one month against its monthly budget"""
+    category: str
+    month: str
+    limit: float
+    spent: float
+    
+    @property
+    def remaining(self) -> float:
+        return (Money.of(self.limit) - Money.of(self.spent)).rupees
+    
+    @property
+    def fraction(self) -> float:
+        return self.spent / self.limit
+    
+    @property
+    def over(self) -> bool:
+        return Money.of(self.spent) > Money.of(self.limit)
@@ -1,6 +1,9 @@
 # utils.py (Enhanced for mobile)
 from datetime import datetime, timedelta
-from typing import List, Tuple
+from typing import List
+
+# Re-exported: the screens and the importer share one amount check
+from udhar.models import validate_amount
 
 def format_currency(amount: float) -> str:
     """Format amount in Indian Rupee style"""
@@ -29,16 +32,6 @@ def get_month_options() -> List[str]:
         months.append(date.strftime("%Y-%m"))
     return months
 
-def validate_amount(amount_str: str) -> Tuple[bool, float]:
-    """Validate and convert amount string to float"""
-    try:
-        amount = float(amount_str)
-        if amount <= 0:
-            return False, 0
-        return True, amount
-    except ValueError:
-        return False, 0
-
 def get_category_suggestions() -> List[str]:
     """Common expense categories"""
     return [
@@ -57,4 +50,12 @@ def get_status_color(status: str) -> tuple:
         'expense': (0.9, 0.2, 0.2, 1),    # Red
         'income': (0.2, 0.7, 0.2, 1),     # Green
     }
-    return colors.get(status, (0.5, 0.5, 0.5, 1))
\ No newline at end of file
+    return colors.get(status, (0.5, 0.5, 0.5, 1))
+
+def get_budget_color(fraction: float) -> tuple:
+    """Return RGB color for the share of a budget spent"""
+    if fraction > 1:
+        return (0.9, 0.2, 0.2, 1)     # Red: over budget
+    if fraction >= 0.8:
+        return (0.9, 0.6, 0.1, 1)     # Orange: nearly used up
+    return (0.2, 0.7, 0.2, 1)         # Green
\ No newline at end of file
@@ -4,7 +4,8 @@ from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.uix.textinput import TextInput
 from kivy.uix.spinner import Spinner
-from kivy.graphics import Color, RoundedRectangle
+from kivy.uix.widget import Widget
+from kivy.graphics import Color, Rectangle, RoundedRectangle
 from kivy.properties import ListProperty, StringProperty, NumericProperty
 from kivy.metrics import dp
 
@@ -18,13 +19,52 @@ class Card(BoxLayout):
         self.padding = dp(10)
         self.spacing = dp(5)
         self.size_hint_y = None
-        self.bind(pos=self.update_canvas, size=self.update_canvas)
         
-    def update_canvas(self, *args):
-        self.canvas.before.clear()
+        # Created once and updated in place: layout passes move hundreds
+        # of cards, so they must not allocate new instructions
         with self.canvas.before:
-            Color(*self.bg_color)
-            RoundedRectangle(pos=self.pos, size=self.size, radius=self.radius)
+            self.bg_color_instruction = Color(*self.bg_color)
+            self.bg_rect = RoundedRectangle(pos=self.pos, size=self.size, radius=self.radius)
+        self.bind(pos=self.update_canvas, size=self.update_canvas,
+                  bg_color=self.update_color, radius=self.update_radius)
+        
+    def update_canvas(self, *args):
+        self.bg_rect.pos = self.pos
+        self.bg_rect.size = self.size
+    
+    def update_color(self, *args):
+        self.bg_color_instruction.rgba = self.bg_color
+    
+    def update_radius(self, *args):
+        self.bg_rect.radius = self.radius
+
+class Bar(Widget):
+    """Horizontal progress bar: a track with the first `fraction` filled.
+    Like Card, its instructions are persistent and updated in place."""
+    fraction = NumericProperty(0)
+    color = ListProperty([0.2, 0.6, 0.9, 1])
+    track_color = ListProperty([0.9, 0.9, 0.9, 1])
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        with self.canvas:
+            self.track_color_instruction = Color(*self.track_color)
+            self.track = Rectangle()
+            self.fill_color_instruction = Color(*self.color)
+            self.fill = Rectangle()
+        self.bind(pos=self.update_canvas, size=self.update_canvas,
+                  fraction=self.update_canvas, color=self.update_color,
+                  track_color=self.update_color)
+        self.update_canvas()
+    
+    def update_canvas(self, *args):
+        self.track.pos = self.fill.pos = self.pos
+        self.track.size = self.size
+        self.fill.size = (self.width * max(0, min(self.fraction, 1)), self.height)
+    
+    def update_color(self, *args):
+        self.fill_color_instruction.rgba = self.color
+        self.track_color_instruction.rgba = self.track_color
 
 class StatusBadge(Label):
     status = StringProperty('pending')
@@ -0,0 +1,44 @@
+# widgets/debug_overlay.py
+from kivy.uix.label import Label
+from kivy.graphics import Color, Rectangle
+from kivy.metrics import dp
+from kivy.clock import Clock
+
+class DebugOverlay(Label):
+    """One-line performance readout for the current screen: frame rate,
+    its last refresh split into DB time and widget time, and the query
+    cache hit rate"""
+    def __init__(self, screen_manager, **kwargs):
+        super().__init__(
+            size_hint_y=None,
+            height=dp(20),
+            font_size='11sp',
+            color=(1, 1, 1, 1),
+            **kwargs
+        )
+        self.screen_manager = screen_manager
+        with self.canvas.before:
+            Color(0, 0, 0, 0.7)
+            self.bg = Rectangle()
+        self.bind(pos=self.update_bg, size=self.update_bg)
+        self.event = Clock.schedule_interval(self.update, 0.5)
+
+    def update_bg(self, *args):
+        self.bg.pos = self.pos
+        self.bg.size = self.size
+
+    def update(self, dt):
+        screen = self.screen_manager.current_screen
+        text = f'{Clock.get_rfps()} fps'
+        refresh = getattr(screen, 'last_refresh', None)
+        if refresh:
+            text += (f' | {screen.name}: DB {refresh["db_ms"]:.1f} ms, '
+                     f'widgets {refresh["ui_ms"]:.1f} ms '
+                     f'({refresh["requests"]} queries)')
+        cache = screen.db.cache_stats() if hasattr(screen, 'db') else None
+        if cache:
+            text += f' | cache {cache["hit_rate"]:.0%} of {cache["hits"] + cache["misses"]}'
+        self.text = text
+
+    def stop(self):
+        self.event.cancel()
@@ -0,0 +1,326 @@
+# widgets/list_widgets.py
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.label import Label
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.metrics import dp
+
+from widgets.custom_widgets import Card, PrimaryButton, SecondaryButton
+from utils import format_currency
+
+# Row data keys that RecycleBoxLayout reads to size and place a row
+LAYOUT_FIELDS = ('height', 'width', 'size', 'size_hint', 'size_hint_x',
+                 'size_hint_y', 'pos_hint')
+
+class RecycleList(RecycleView):
+    """Virtualized vertical list: only the rows on screen exist as widgets,
+    re-bound to entries of `data` (plain dicts) as the list scrolls.
+    
+    `owner` is the screen that row widgets report touches/actions to.
+    
+    With a `key` (the data field holding a record id), rows set through
+    set_rows/extend_rows/insert_row are indexed by it, so a change to one
+    record finds its dict in O(1) instead of scanning `data`.
+    """
+    def __init__(self, viewclass, owner, row_height, key=None, **kwargs):
+        super().__init__(**kwargs)
+        self.owner = owner
+        self.key = key
+        self.rows_by_key = {}
+        layout = RecycleBoxLayout(
+            orientation='vertical',
+            spacing=dp(5),
+            size_hint_y=None,
+            default_size_hint=(1, None),
+            default_size=(None, row_height)
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+        # viewclass is forwarded to the layout manager, so set it after adding one
+        self.viewclass = viewclass
+    
+    def set_rows(self, rows):
+        self.rows_by_key = {row[self.key]: row for row in rows}
+        self.data = rows
+    
+    def extend_rows(self, rows):
+        self.rows_by_key.update((row[self.key], row) for row in rows)
+        self.data.extend(rows)
+    
+    def insert_row(self, index, row):
+        self.rows_by_key[row[self.key]] = row
+        self.data.insert(index, row)
+    
+    def remove_row(self, key):
+        """Drop the row for key; the list shift itself is still O(n)"""
+        row = self.rows_by_key.pop(key, None)
+        if row is not None:
+            self.data.remove(row)
+        return row
+    
+    def patch_row(self, key, values):
+        """Update the row for key and redraw it if it is on screen.
+        
+        When only display fields change the dict is updated in place and
+        just the visible views are re-bound, O(1) in the list length. A
+        change to a layout field (an udhar row shrinks once cleared) is
+        written back through data[index] so the layout is recomputed.
+        Returns the row's previous values, or None if there is no such row.
+        """
+        row = self.rows_by_key.get(key)
+        if row is None:
+            return None
+        previous = dict(row)
+        row.update(values)
+        if any(previous.get(field) != row.get(field) for field in LAYOUT_FIELDS):
+            # Kivy caches sizes per index; reassigning marks it modified
+            data = self.data
+            for index, item in enumerate(data):
+                if item is row:
+                    data[index] = row
+                    break
+            return previous
+        adapter = self.view_adapter
+        for index, view in adapter.views.items():
+            if self.data[index] is row:
+                adapter.refresh_view_attrs(index, row, view)
+        return previous
+
+class TransactionRow(RecycleDataViewBehavior, Card):
+    """One expense/income entry; see expense_row() for its data dict"""
+    def __init__(self, **kwargs):
+        super().__init__(bg_color=(0.98, 0.98, 0.98, 1), radius=[dp(5)], **kwargs)
+        self.rv = None
+        self.exp_id = None
+        
+        # Top row: Date and Amount
+        top_row = BoxLayout(size_hint_y=None, height=dp(30))
+        self.date_label = Label(
+            font_size='12sp',
+            color=(0.5, 0.5, 0.5, 1),
+            halign='left'
+        )
+        self.amount_label = Label(
+            font_size='14sp',
+            bold=True,
+            halign='right'
+        )
+        top_row.add_widget(self.date_label)
+        top_row.add_widget(self.amount_label)
+        self.add_widget(top_row)
+        
+        # Bottom row: Category and Description
+        bottom_row = BoxLayout(size_hint_y=None, height=dp(30))
+        self.detail_label = Label(
+            font_size='12sp',
+            color=(0.3, 0.3, 0.3, 1),
+            halign='left'
+        )
+        bottom_row.add_widget(self.detail_label)
+        self.add_widget(bottom_row)
+    
+    def refresh_view_attrs(self, rv, index, data):
+        self.rv = rv
+        self.exp_id = data['exp_id']
+        self.date_label.text = data['date']
+        self.amount_label.text = data['amount_text']
+        self.amount_label.color = data['color']
+        self.detail_label.text = data['detail']
+        return super().refresh_view_attrs(rv, index, data)
+    
+    def on_touch_down(self, touch):
+        if self.collide_point(*touch.pos) and self.rv:
+            self.rv.owner.on_item_touch(touch, self.exp_id)
+        return super().on_touch_down(touch)
+
+def expense_row(exp) -> dict:
+    """Map an ExpenseRecord to TransactionRow data"""
+    if exp.transaction_type == 'income':
+        color = (0.2, 0.7, 0.2, 1)
+        sign = '+'
+    else:
+        color = (0.9, 0.2, 0.2, 1)
+        sign = '-'
+    return {
+        'exp_id': exp.id,
+        'date': exp.date,
+        'amount_text': f'{sign}{format_currency(exp.amount)}',
+        'color': color,
+        'detail': f'{exp.category} • {(exp.description or "")[:20]}',
+    }
+
+STATUS_COLORS = {
+    'pending': (0.9, 0.2, 0.2, 1),
+    'partial': (0.9, 0.6, 0.1, 1),
+    'cleared': (0.2, 0.7, 0.2, 1)
+}
+
+class UdharRow(RecycleDataViewBehavior, Card):
+    """One udhar record; see udhar_row() for its data dict"""
+    def __init__(self, **kwargs):
+        super().__init__(bg_color=(0.98, 0.98, 0.98, 1), radius=[dp(8)], **kwargs)
+        self.rv = None
+        self.udhar_id = None
+        self.remaining = 0
+        
+        # Header with name and status
+        header = BoxLayout(size_hint_y=None, height=dp(35))
+        self.person_label = Label(
+            font_size='16sp',
+            bold=True,
+            halign='left',
+            color=(0.2, 0.2, 0.2, 1)
+        )
+        self.status_label = Label(
+            font_size='12sp',
+            bold=True,
+            size_hint_x=None,
+            width=dp(80)
+        )
+        history_btn = SecondaryButton(
+            text='History',
+            font_size='12sp',
+            size_hint=(None, None),
+            size=(dp(70), dp(30))
+        )
+        history_btn.bind(on_press=lambda x: self.rv.owner.open_person(
+            self.person_label.text))
+        header.add_widget(self.person_label)
+        header.add_widget(history_btn)
+        header.add_widget(self.status_label)
+        self.add_widget(header)
+        
+        # Amount details
+        amounts = BoxLayout(size_hint_y=None, height=dp(30))
+        self.total_label = Label(font_size='13sp', color=(0.4, 0.4, 0.4, 1))
+        self.paid_label = Label(font_size='13sp', color=(0.2, 0.6, 0.2, 1))
+        self.due_label = Label(font_size='13sp', bold=True, color=(0.9, 0.2, 0.2, 1))
+        amounts.add_widget(self.total_label)
+        amounts.add_widget(self.paid_label)
+        amounts.add_widget(self.due_label)
+        self.add_widget(amounts)
+        
+        # Date info
+        info = BoxLayout(size_hint_y=None, height=dp(25))
+        self.date_label = Label(
+            font_size='11sp',
+            color=(0.5, 0.5, 0.5, 1),
+            halign='left'
+        )
+        info.add_widget(self.date_label)
+        self.add_widget(info)
+        
+        # Action buttons, only attached while the record is not cleared
+        self.actions = BoxLayout(size_hint_y=None, height=dp(40), spacing=dp(5))
+        pay_btn = SecondaryButton(text='Record Payment', size_hint_x=0.5)
+        pay_btn.bind(on_press=lambda x: self.rv.owner.show_payment_popup(
+            self.udhar_id, self.remaining))
+        full_btn = PrimaryButton(text='Mark Cleared', size_hint_x=0.5)
+        full_btn.bind(on_press=lambda x: self.rv.owner.mark_cleared(
+            self.udhar_id, self.remaining))
+        self.actions.add_widget(pay_btn)
+        self.actions.add_widget(full_btn)
+    
+    def refresh_view_attrs(self, rv, index, data):
+        self.rv = rv
+        self.udhar_id = data['udhar_id']
+        self.remaining = data['remaining']
+        
+        self.person_label.text = data['person']
+        self.status_label.text = data['status'].upper()
+        self.status_label.color = STATUS_COLORS.get(data['status'], (0.5, 0.5, 0.5, 1))
+        self.total_label.text = data['total_text']
+        self.paid_label.text = data['paid_text']
+        self.due_label.text = data['due_text']
+        self.date_label.text = data['date_text']
+        
+        if data['active'] and not self.actions.parent:
+            self.add_widget(self.actions)
+        elif not data['active'] and self.actions.parent:
+            self.remove_widget(self.actions)
+        return super().refresh_view_attrs(rv, index, data)
+    
+    def on_touch_down(self, touch):
+        if self.collide_point(*touch.pos) and self.rv:
+            self.rv.owner.on_card_touch(touch, self.udhar_id)
+        return super().on_touch_down(touch)
+
+def udhar_row(udhar) -> dict:
+    """Map an UdharRecord to UdharRow data"""
+    remaining = udhar.remaining_amount
+    date_text = f'Given: {udhar.date_given}'
+    if udhar.due_date:
+        date_text += f' | Due: {udhar.due_date}'
+    active = udhar.status != 'cleared'
+    return {
+        'udhar_id': udhar.id,
+        'date_given': udhar.date_given,
+        'person': udhar.person_name,
+        'status': udhar.status,
+        'remaining': remaining,
+        'total_text': f'Total: {format_currency(udhar.amount)}',
+        'paid_text': f'Paid: {format_currency(udhar.amount_paid)}',
+        'due_text': f'Due: {format_currency(remaining)}',
+        'date_text': date_text,
+        'active': active,
+        # Cleared records have no action row
+        'height': dp(120) if active else dp(85),
+    }
+
+class HistoryRow(RecycleDataViewBehavior, Card):
+    """One loan or payment in a person's history; see history_row()"""
+    def __init__(self, **kwargs):
+        super().__init__(bg_color=(0.98, 0.98, 0.98, 1), radius=[dp(5)], **kwargs)
+        
+        top_row = BoxLayout(size_hint_y=None, height=dp(30))
+        self.date_label = Label(
+            font_size='12sp',
+            color=(0.5, 0.5, 0.5, 1),
+            halign='left'
+        )
+        self.amount_label = Label(
+            font_size='14sp',
+            bold=True,
+            halign='right'
+        )
+        top_row.add_widget(self.date_label)
+        top_row.add_widget(self.amount_label)
+        self.add_widget(top_row)
+        
+        self.detail_label = Label(
+            font_size='12sp',
+            color=(0.3, 0.3, 0.3, 1),
+            halign='left',
+            size_hint_y=None,
+            height=dp(25)
+        )
+        self.add_widget(self.detail_label)
+    
+    def refresh_view_attrs(self, rv, index, data):
+        self.date_label.text = data['date']
+        self.amount_label.text = data['amount_text']
+        self.amount_label.color = data['color']
+        self.detail_label.text = data['detail']
+        return super().refresh_view_attrs(rv, index, data)
+
+def history_row(entry) -> dict:
+    """Map a Database.get_person_history HistoryEntry to HistoryRow data"""
+    if entry.kind == 'loan':
+        text = f'Lent • {entry.status.upper()}'
+        color = (0.9, 0.3, 0.1, 1)
+        sign = ''
+    else:
+        text = 'Payment received'
+        color = (0.2, 0.7, 0.2, 1)
+        sign = '+'
+    if entry.detail:
+        text += f' • {entry.detail[:20]}'
+    return {
+        'kind': entry.kind,
+        'entry_id': entry.id,
+        'date': entry.date,
+        'amount_text': f'{sign}{format_currency(entry.amount)}',
+        'color': color,
+        'detail': text,
+    }